@@ -0,0 +1,46 @@
+from collections import deque
+
+# --- Adaptive Quality ---
+# Walks a ladder of quality levels (lowest first) to keep each frame's work time
+# (frameTimer: everything but the clock.tick wait) inside the frame budget.
+# Hysteresis: a level drops as soon as the median of a short window of frames is
+# over drop_at of the budget (the median, so one-off hitches don't cost quality),
+# but only climbs after a long window averaging under raise_at. A climb that has to
+# be undone soon after doubles how long the next climb waits (up to MAX_BACKOFF),
+# so a level the machine can't hold isn't retried every few seconds; holding a
+# climbed-to level for a long stretch halves the wait again.
+MAX_BACKOFF = 16
+
+class QualityController:
+    def __init__(self, levels, start, budget_ms, drop_at=0.95, raise_at=0.7, drop_window=15, raise_window=120):
+        self.levels, self.level = levels, start
+        self.budget = budget_ms / 1000
+        self.drop_at, self.raise_at = drop_at, raise_at
+        self.drop_window, self.raise_window = drop_window, raise_window
+        self.frames = deque(maxlen=raise_window)
+        self.since_change, self.backoff, self.raised = 0, 1, False
+
+    def current(self):
+        return self.levels[self.level]
+
+    def update(self, work):
+        # work: seconds of this frame. Returns True when the level changed.
+        self.frames.append(work); self.since_change += 1
+        if self.since_change >= self.drop_window and self.level > 0:
+            recent = sorted(list(self.frames)[-self.drop_window:])
+            if recent[len(recent) // 2] > self.budget * self.drop_at:
+                if self.raised and self.since_change < 4 * self.raise_window * self.backoff:
+                    self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+                return self.change(-1)
+        if self.raised and self.since_change % (8 * self.raise_window) == 0 and self.backoff > 1:
+            self.backoff //= 2
+        if self.since_change >= self.raise_window * self.backoff and self.level < len(self.levels) - 1:
+            if sum(self.frames) / len(self.frames) < self.budget * self.raise_at:
+                return self.change(+1)
+        return False
+
+    def change(self, step):
+        self.level += step
+        self.raised = step > 0
+        self.frames.clear(); self.since_change = 0
+        return True
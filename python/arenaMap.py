@@ -0,0 +1,167 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Arena Map Compile Step ---
+# Layers derived from a grid[x][z] of cell values (>= 3 is wall) that the viewer
+# would otherwise recompute at every launch.
+WALL = 3
+DIST_CAP = 255 # distance field is stored as bytes
+
+# --- Distance Field ---
+# field[x][z] = Chebyshev distance (in cells) from that cell to the nearest wall,
+# with everything outside the map counting as wall. 0 on walls, 1 next to one.
+# Every cell within field-1 cells (in both x and z) of a cell is open floor, so a
+# ray, rocket or rider can leap that far without looking at the grid.
+# Two-pass 3x3 chamfer, which is exact for the Chebyshev metric.
+def distance_field(grid):
+    if np is not None:
+        field = distance_field_np(np.asarray(grid))
+        return field if isinstance(grid, np.ndarray) else field.tolist()
+    size_x, size_z = len(grid), len(grid[0])
+    field = [[0 if grid[x][z] >= WALL else min(x + 1, z + 1, size_x - x, size_z - z, DIST_CAP)
+              for z in range(size_z)] for x in range(size_x)]
+    for x in range(size_x):
+        row, prev = field[x], field[x - 1] if x > 0 else None
+        for z in range(size_z):
+            d = row[z]
+            if d == 0: continue
+            if z > 0 and row[z - 1] + 1 < d: d = row[z - 1] + 1
+            if prev is not None:
+                for pz in (z - 1, z, z + 1):
+                    if 0 <= pz < size_z and prev[pz] + 1 < d: d = prev[pz] + 1
+            row[z] = d
+    for x in range(size_x - 1, -1, -1):
+        row, nxt = field[x], field[x + 1] if x < size_x - 1 else None
+        for z in range(size_z - 1, -1, -1):
+            d = row[z]
+            if d == 0: continue
+            if z < size_z - 1 and row[z + 1] + 1 < d: d = row[z + 1] + 1
+            if nxt is not None:
+                for nz in (z - 1, z, z + 1):
+                    if 0 <= nz < size_z and nxt[nz] + 1 < d: d = nxt[nz] + 1
+            row[z] = d
+    return field
+
+def distance_field_np(grid):
+    # Same two passes, one row at a time: the dependency on the previous row is a
+    # vector min, the dependency along the row is a running min of (d - z) + z.
+    size_x, size_z = grid.shape
+    xs, zs = np.arange(size_x)[:, None], np.arange(size_z)[None, :]
+    field = np.minimum(np.minimum(xs + 1, size_x - xs), np.minimum(zs + 1, size_z - zs)).astype(np.int32)
+    field = np.minimum(field, DIST_CAP)
+    field[grid >= WALL] = 0
+    z = np.arange(size_z)
+    for order in (range(size_x), range(size_x - 1, -1, -1)):
+        prev = None
+        for x in order:
+            row = field[x]
+            if prev is not None:
+                near = prev.copy()
+                near[1:] = np.minimum(near[1:], prev[:-1])
+                near[:-1] = np.minimum(near[:-1], prev[1:])
+                row = np.minimum(row, near + 1)
+            if order.step == 1:
+                row = np.minimum(row, np.minimum.accumulate(row - z) + z)
+            else:
+                row = np.minimum(row, (np.minimum.accumulate((row + z)[::-1]) - z[::-1])[::-1])
+            field[x] = row
+            prev = field[x]
+    return np.minimum(field, DIST_CAP).astype(np.uint8)
+
+# --- Binary Arena Container (.arena) ---
+# header:  magic 'ARNA', version, width, height, layer count       <4sHIIH
+# table:   per layer: name (8 bytes), offset, length               <8sQQ
+# data:    each layer 16-byte aligned; cell layers are width*height uint8, x-major,
+#          so cell (x, z) of a layer lives at offset + x*height + z.
+# 'grid' is always present; 'dist' (distance field) and anything else are optional.
+ARENA_MAGIC, ARENA_VERSION = b'ARNA', 1
+HEADER, LAYER_ENTRY = struct.Struct('<4sHIIH'), struct.Struct('<8sQQ')
+
+def _layer_bytes(layer):
+    if isinstance(layer, (bytes, bytearray, memoryview)): return bytes(layer)
+    if np is not None and isinstance(layer, np.ndarray): return np.ascontiguousarray(layer, dtype=np.uint8).tobytes()
+    return b''.join(row if isinstance(row, bytes) else bytes(min(v, 255) for v in row) for row in layer)
+
+def save_arena(path, grid, **layers):
+    width, height = len(grid), len(grid[0])
+    blobs = [('grid', _layer_bytes(grid))] + [(n, _layer_bytes(l)) for n, l in layers.items()]
+    offset = HEADER.size + LAYER_ENTRY.size * len(blobs)
+    table = []
+    for name, blob in blobs:
+        offset = (offset + 15) & ~15
+        table.append((name, offset, blob)); offset += len(blob)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(ARENA_MAGIC, ARENA_VERSION, width, height, len(blobs)))
+        for name, off, blob in table: f.write(LAYER_ENTRY.pack(name.encode(), off, len(blob)))
+        for name, off, blob in table:
+            f.write(b'\0' * (off - f.tell())); f.write(blob)
+
+class Arena:
+    # Memory-mapped .arena file. Nothing is copied on load: layers are memoryview
+    # slices of the mapping. writable=True maps copy-on-write, so edits (wall
+    # recolor, spawn clearing) stay private to this process and never touch disk.
+    def __init__(self, path, writable=False):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+        magic, version, self.width, self.height, count = HEADER.unpack_from(self.mm, 0)
+        if magic != ARENA_MAGIC or version != ARENA_VERSION:
+            raise ValueError(f"{path}: not an arena file (v{ARENA_VERSION})")
+        view = memoryview(self.mm)
+        self.layers = {}
+        for i in range(count):
+            name, off, length = LAYER_ENTRY.unpack_from(self.mm, HEADER.size + i * LAYER_ENTRY.size)
+            self.layers[name.rstrip(b'\0').decode()] = view[off:off + length]
+
+    def rows(self, name='grid'):
+        # rows[x][z] indexing like the JSON list-of-lists, one zero-copy slice per row
+        layer, h = self.layers[name], self.height
+        return [layer[x * h:(x + 1) * h] for x in range(self.width)]
+
+    def array(self, name='grid'):
+        # (width, height) uint8 NumPy view of the same memory
+        return np.frombuffer(self.layers[name], dtype=np.uint8).reshape(self.width, self.height)
+
+def load_arena(path, writable=False):
+    return Arena(path, writable)
+
+def convert_json(src, dst=None):
+    # JSON list-of-lists arena -> .arena, computing the distance field if missing.
+    with open(src, "r") as f: data = json.load(f)
+    dst = dst or src.rsplit('.', 1)[0] + ".arena"
+    save_arena(dst, data['grid'], dist=data['dist'] if 'dist' in data else distance_field(data['grid']))
+    return dst
+
+# --- Compiled Map Cache ---
+# A viewer's prepared map (e.g. recolored walls, cleared spawns, distance field)
+# cached as an .arena in CACHE_DIR next to the source map, keyed by the source
+# file's hash, the seed and the caller's version. build() only runs on a miss;
+# a warm launch just maps the cached file.
+CACHE_DIR = ".arena_cache"
+
+def compiled_arena(src, seed, build, version=1):
+    with open(src, "rb") as f: digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    cache_dir = os.path.join(os.path.dirname(src), CACHE_DIR)
+    name = os.path.basename(src).rsplit('.', 1)[0]
+    path = os.path.join(cache_dir, f"{name}-{digest}-s{seed}-v{version}.arena")
+    if not os.path.exists(path):
+        grid, layers = build()
+        os.makedirs(cache_dir, exist_ok=True)
+        save_arena(path + ".tmp", grid, **layers)
+        os.replace(path + ".tmp", path)
+    return load_arena(path)
+
+if __name__ == "__main__":
+    import sys
+    # python arenaMap.py convert mega_arena.json [out.arena]
+    cmd, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("convert", [])
+    if cmd == "convert":
+        print(f"Wrote {convert_json(*(args or ['mega_arena.json']))}")
+    else:
+        print("usage: arenaMap.py convert <map.json> [out.arena]")
@@ -0,0 +1,198 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse
+import atexit
+import json
+import math
+import platform
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+import mapView110
+import rollerGame54
+from arenaMap import save_arena
+from frameTimer import StageTimer
+from renderTarget import UPSCALE_FILTERS
+from qualityPresets import PRESETS, apply_preset
+
+# --- Headless Frame Benchmark ---
+# Renders both games with no window (SDL dummy drivers) along scripted player paths
+# and reports per-stage frame times (p50/p95/p99/max in ms) for each resolution,
+# NUM_RAYS, ray backend and render worker count. With --json every configuration is appended as one JSON
+# line, tagged with the git revision, so runs from different versions can be
+# compared with --baseline.
+#   python benchArena.py --res 1200x600 1920x1080 --rays 120 240 480 --json bench.jsonl
+RESOLUTIONS = ["1200x600", "1920x1080"]
+RAY_COUNTS = [120, 240, 480]
+FRAMES, WARMUP = 300, 20
+
+class Silent:
+    def play(self, *args): pass
+
+def percentiles(samples):
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))] * 1000
+    return {'p50': round(pick(0.50), 3), 'p95': round(pick(0.95), 3), 'p99': round(pick(0.99), 3), 'max': round(s[-1] * 1000, 3)}
+
+def summarize(frames):
+    # frames: list of {stage: seconds}; every stage plus the frame total
+    stages = defaultdict(list)
+    for f in frames:
+        for name, t in f.items(): stages[name].append(t)
+        stages['total'].append(sum(f.values()))
+    return {name: percentiles(ts) for name, ts in stages.items()}
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError: return None
+
+def scripted_keys(frame, controls):
+    # Always pedalling; turns in slow alternating arcs and fires every 45 frames.
+    keys = defaultdict(bool)
+    keys[controls[0]] = True
+    keys[controls[2] if (frame // 90) % 2 else controls[3]] = frame % 3 == 0
+    keys[controls[1]] = frame % 45 == 0
+    return keys
+
+# --- Arena ---
+def load_bench_map(seed):
+    # The game's own map if there is one here, otherwise a seeded mapGen24 arena
+    # written to a temp dir (removed at exit, with its .arena_cache) and prepared
+    # through the same compiled-map cache.
+    if not any(os.path.exists(p) for p in (mapView110.WORLD_DIR, mapView110.ARENA_FILE, mapView110.JSON_FILE)):
+        from mapGen24 import generate
+        tmp = tempfile.TemporaryDirectory(prefix="bench_arena_", ignore_cleanup_errors=True)
+        atexit.register(tmp.cleanup)
+        mapView110.ARENA_FILE = os.path.join(tmp.name, "bench.arena")
+        mapView110.JSON_FILE = os.path.join(tmp.name, "missing.json")
+        save_arena(mapView110.ARENA_FILE, generate(200, seed))
+    return mapView110.load_map()
+
+def bench_arena(screen, grid, field, arena, backend, num_rays, workers, frames, seed):
+    mv = mapView110
+    mv.NUM_RAYS, mv.RAY_BACKEND = num_rays, backend
+    mv.background_layers.clear(); mv.view_buffers.clear(); mv.render_targets.clear()
+    grid_np, ray_field = None, field
+    if backend == 'numpy' and arena: grid_np, ray_field = arena.array('grid'), arena.array('dist')
+    world = grid if isinstance(grid, mv.TileWorld) else None # streams tiles in the background, as in the game
+    if world: world.sync_loads = 0
+    mv.random.seed(seed)
+    clouds = [mv.WorldCloud() for _ in range(mv.CLOUD_COUNT)]
+    p1 = mv.Player("Blue", 15, 15, (0, 120, 255), [pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d], (0, 255, 255))
+    p2 = mv.Player("Red", 185, 185, (240, 30, 30), [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT], (255, 0, 255))
+    p1.angle, p2.angle = math.pi / 4, math.pi * 5 / 4
+    sounds = Silent()
+    cw, ch = screen.get_size()
+    timer, samples = StageTimer(), []
+    pool = ThreadPoolExecutor(workers) if workers > 1 else None
+    for frame in range(WARMUP + frames):
+        timer.start()
+        if world:
+            for p in (p1, p2): world.request_around(p.x, p.z, mv.DRAW_DIST * mv.RAY_STEP)
+        for c in clouds: c.update()
+        p1.update(scripted_keys(frame, p1.controls), grid, sounds, p2, field)
+        p2.update(scripted_keys(frame + 45, p2.controls), grid, sounds, p1, field)
+        timer.mark('update')
+        screen.fill((0, 0, 0))
+        mv.draw_split(screen, pool, p1, p2, grid, clouds, cw, ch, grid_np, ray_field, timer)
+        pygame.display.flip()
+        timer.mark('flip')
+        stages = timer.frame()
+        if frame >= WARMUP: samples.append(stages)
+    if pool: pool.shutdown()
+    return summarize(samples)
+
+# --- Roller ---
+def bench_roller(game, humans, frames):
+    game.num_humans = humans
+    game.setup_race(); game.state = "PLAYING"
+    timer, samples = StageTimer(), []
+    game.timer = timer
+    for frame in range(WARMUP + frames):
+        timer.start()
+        game.p1.pulses += 4; game.p2.pulses += 4 if humans == 2 else 0
+        if frame % 120 == 60: game.p1.lane_idx = (game.p1.lane_idx + 1) % 5
+        game.update_game(time.time())
+        timer.mark('update')
+        game.draw_frame()
+        pygame.display.flip()
+        timer.mark('flip')
+        stages = timer.frame()
+        if frame >= WARMUP: samples.append(stages)
+    game.timer = rollerGame54.NULL_TIMER
+    return summarize(samples)
+
+def report(record, baseline):
+    st = record['stages']
+    order = [s for s in ('update', 'sky', 'raycast', 'walls', 'sprites', 'blit', 'views', 'hud', 'scale', 'flip') if s in st]
+    line = "  ".join(f"{s} {st[s]['p50']:.2f}/{st[s]['p95']:.2f}" for s in order)
+    cfg = f"{record['game']:6} {record['res']:>9} " + (f"{record['backend']:6} rays={record['rays']:<4} workers={record['workers']}" if record['game'] == 'arena' else f"humans={record['humans']}") + f" {record['upscale']}@{record['scale']}"
+    base = baseline.get(config_key(record))
+    delta = f"  (p95 was {base['stages']['total']['p95']:.2f})" if base else ""
+    if record.get('sync_loads') is not None: line += f"  tiles loaded on the frame path {record['sync_loads']}"
+    print(f"{cfg} total {st['total']['p50']:.2f}/{st['total']['p95']:.2f} ms{delta}\n    {line}")
+
+def config_key(r):
+    return (r['game'], r['res'], r.get('backend'), r.get('rays'), r.get('workers', 1), r.get('humans'), r.get('scale'), r.get('upscale'), r.get('preset'))
+
+def load_baseline(path):
+    if not path: return {}
+    with open(path, "r") as f: records = [json.loads(l) for l in f if l.strip()]
+    return {config_key(r): r for r in records} # last run of each configuration wins
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Headless frame-time benchmark (stage times are p50/p95 ms)")
+    ap.add_argument("--res", nargs="+", default=RESOLUTIONS, help="WxH window sizes")
+    ap.add_argument("--rays", nargs="+", type=int, default=RAY_COUNTS)
+    ap.add_argument("--backend", nargs="+", default=["python"] + (["numpy"] if mapView110.np is not None else []))
+    ap.add_argument("--workers", nargs="+", type=int, default=[1], help="render worker counts (1 = sequential)")
+    ap.add_argument("--preset", choices=list(PRESETS), help="apply a quality preset to both games (sets --rays too)")
+    ap.add_argument("--scale", type=float, help="RENDER_SCALE for both games (default: each game's own)")
+    ap.add_argument("--upscale", choices=UPSCALE_FILTERS, help="UPSCALE_FILTER for both games")
+    ap.add_argument("--frames", type=int, default=FRAMES)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--game", choices=["arena", "roller", "both"], default="both")
+    ap.add_argument("--json", help="append one JSON line per configuration to this file")
+    ap.add_argument("--baseline", help="earlier --json file to compare p95 totals against")
+    args = ap.parse_args()
+    baseline = load_baseline(args.baseline)
+    meta = {'rev': git_rev(), 'time': time.strftime("%Y-%m-%dT%H:%M:%S"), 'python': platform.python_version(),
+            'pygame': pygame.version.ver, 'machine': platform.machine(), 'frames': args.frames}
+    meta['preset'] = args.preset
+    for game_module in (mapView110, rollerGame54):
+        if args.preset: apply_preset(game_module, args.preset)
+        if args.scale: game_module.RENDER_SCALE = args.scale
+        if args.upscale: game_module.UPSCALE_FILTER = args.upscale
+    if args.preset: args.rays = [mapView110.NUM_RAYS]
+    records = []
+    if args.game in ("arena", "both"):
+        pygame.init()
+        grid, field, arena = load_bench_map(args.seed)
+        for res in args.res:
+            screen = pygame.display.set_mode(tuple(int(v) for v in res.split("x")))
+            for backend in args.backend:
+                if backend == 'numpy' and not arena: continue
+                for rays in args.rays:
+                    for workers in args.workers:
+                        records.append(dict(meta, game='arena', res=res, backend=backend, rays=rays, workers=workers,
+                                            scale=mapView110.RENDER_SCALE, upscale=mapView110.UPSCALE_FILTER,
+                                            stages=bench_arena(screen, grid, field, arena, backend, rays, workers, args.frames, args.seed),
+                                            sync_loads=getattr(grid, 'sync_loads', None)))
+                        report(records[-1], baseline)
+    if args.game in ("roller", "both"):
+        game = rollerGame54.RollerGame()
+        for res in args.res:
+            game.screen = pygame.display.set_mode(tuple(int(v) for v in res.split("x")))
+            for humans in (1, 2):
+                records.append(dict(meta, game='roller', res=res, humans=humans, scale=rollerGame54.RENDER_SCALE,
+                                    upscale=rollerGame54.UPSCALE_FILTER, stages=bench_roller(game, humans, args.frames)))
+                report(records[-1], baseline)
+    if args.json:
+        with open(args.json, "a") as f:
+            for r in records: f.write(json.dumps(r) + "\n")
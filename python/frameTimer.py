@@ -0,0 +1,112 @@
+import os
+import time
+from collections import deque
+import pygame
+
+# --- Stage Timer ---
+# Splits a frame into named stages: call start() at the top of the frame, mark(name)
+# after each stage (time since the previous mark is charged to it), and frame() at
+# the end to collect {stage: seconds} and reset. Renderers take NULL_TIMER by
+# default so the marks cost nothing when nobody is measuring.
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+        self.last = time.perf_counter()
+
+    def start(self):
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last)
+        self.last = now
+
+    def merge(self, stages):
+        # Charge the time since the last mark to stages timed on other threads that
+        # ran concurrently, split in proportion to their own times (so the frame
+        # total stays wall time but keeps its per-stage breakdown)
+        now = time.perf_counter()
+        busy = sum(stages.values())
+        for name, t in stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + ((now - self.last) * t / busy if busy else 0.0)
+        self.last = now
+
+    def frame(self):
+        stages, self.stages = self.stages, {}
+        return stages
+
+class NullTimer:
+    def start(self): pass
+    def mark(self, stage): pass
+    def merge(self, stages): pass
+    def frame(self): return {}
+
+NULL_TIMER = NullTimer()
+
+# --- Profiler Overlay + Hitch Log ---
+# Wraps a StageTimer for a game loop: end_frame() after flip (before clock.tick, so
+# idle time is not counted) keeps a rolling window of frames, and any frame whose
+# stages add up to more than budget_ms is appended to HITCH_LOG as one line
+# ("date time total stage=ms ..."), whether or not the overlay is showing.
+# Once the log passes HITCH_LOG_MAX bytes it is rotated to HITCH_LOG + ".1" (the
+# previous .1 is dropped), so a station that can't hold its budget keeps at most
+# two logs' worth on disk.
+# draw() paints FPS, frame times, per-stage averages and a frame-time graph.
+HITCH_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hitches.log")
+HITCH_LOG_MAX = 512 * 1024
+
+class FrameProfiler:
+    def __init__(self, budget_ms, log_path=HITCH_LOG, history=120, log_max=HITCH_LOG_MAX):
+        self.timer = StageTimer()
+        self.budget, self.log_path, self.log_max = budget_ms / 1000, log_path, log_max
+        self.frames = deque(maxlen=history) # (total, {stage: seconds})
+        self.visible, self.font, self.log, self.hitches = False, None, None, 0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def end_frame(self):
+        stages = self.timer.frame()
+        total = sum(stages.values())
+        self.frames.append((total, stages))
+        if total > self.budget: self.log_hitch(total, stages)
+        return total
+
+    def log_hitch(self, total, stages):
+        self.hitches += 1
+        if not self.log_path: return
+        try:
+            if self.log is None: self.log = open(self.log_path, "a", buffering=1)
+            self.log.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {total * 1000:.1f}ms "
+                           + " ".join(f"{name}={t * 1000:.1f}" for name, t in stages.items()) + "\n")
+            if self.log.tell() > self.log_max:
+                self.log.close(); self.log = None
+                os.replace(self.log_path, self.log_path + ".1")
+        except OSError: self.log_path = None # read-only install: keep counting, stop logging
+
+    def draw(self, surface, info=()):
+        # info: extra status lines from the game (e.g. the current quality level)
+        if not self.visible or not self.frames: return
+        if self.font is None: self.font = pygame.font.Font(None, 20)
+        totals = sorted(f[0] for f in self.frames)
+        avg = sum(totals) / len(totals)
+        stage_avg = {}
+        for _, stages in self.frames:
+            for name, t in stages.items(): stage_avg[name] = stage_avg.get(name, 0.0) + t / len(self.frames)
+        lines = [f"FPS {1 / max(avg, 1e-6):5.0f}   frame {avg * 1000:5.1f} ms",
+                 f"p95 {totals[int(0.95 * (len(totals) - 1))] * 1000:5.1f}  max {totals[-1] * 1000:5.1f}  hitches {self.hitches}"]
+        lines += [f"{name:>8} {t * 1000:5.2f} ms" for name, t in stage_avg.items()] + list(info)
+        graph_h, line_h = 40, 16
+        panel = pygame.Surface((220, 12 + line_h * len(lines) + graph_h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, text in enumerate(lines):
+            panel.blit(self.font.render(text, True, (230, 230, 230)), (8, 6 + i * line_h))
+        # Frame-time graph, budget line at half height
+        base = panel.get_height() - 4
+        scale = (graph_h / 2) / self.budget
+        for i, (total, _) in enumerate(self.frames):
+            x, color = 8 + i * 204 // self.frames.maxlen, (240, 80, 60) if total > self.budget else (90, 220, 120)
+            pygame.draw.line(panel, color, (x, base), (x, base - min(graph_h, int(total * scale))))
+        pygame.draw.line(panel, (255, 255, 255), (8, base - graph_h // 2), (212, base - graph_h // 2))
+        surface.blit(panel, (10, 10))
+        self.timer.mark('overlay')
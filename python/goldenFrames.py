@@ -0,0 +1,127 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse
+import math
+import random
+import sys
+import tempfile
+import pygame
+import mapView110
+import rollerGame54
+from mapGen24 import generate
+from rleGrid import RLEGrid
+
+# --- Golden Frames ---
+# Fixed camera poses on a seeded mapGen24 arena (mapView110.draw_arena) and a seeded
+# race (rollerGame54.draw_view), compared against the PNGs in golden/. The goldens
+# are always rendered by the reference Python ray loop over the dense grid with no
+# distance field; every other variant (distance-field leaping, NumPy backend,
+# run-length grid) must match them within tolerance.
+#   python goldenFrames.py            check every variant against golden/
+#   python goldenFrames.py --update   re-render golden/ after an intended change
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+SEED = 7
+VIEW_W, VIEW_H = 640, 320
+CHANNEL_TOL = 24     # a pixel differs if any channel is off by more than this
+PIXEL_TOL = 0.002    # fraction of differing pixels a frame may have
+
+# obs (x, z, angle), target (x, z, angle); the spawns are cleared by prepare_map
+ARENA_POSES = {
+    'spawn_blue':  ((15, 15, math.pi / 4), (40, 40, 0.0)),
+    'spawn_red':   ((185, 185, math.pi * 5 / 4), (160, 160, 2.0)),
+    'long_view':   ((20, 10, 1.3), (60, 150, -1.0)),
+    'edge':        ((7, 28, math.pi), (25, 28, 0.0)),
+    'close_wall':  ((29.5, 17, 0.05), (185, 185, 0.0)),
+    'rockets':     ((12, 25, 0.6), (28, 20, 3.0)),
+}
+ROLLER_POSES = {
+    # humans, viewer, p1 (z, lane, speed), p2 (z, lane, speed)
+    'solo_start':  (1, 'p1', (0, 2, 0.0), (0, 2, 0.0)),
+    'solo_riding': (1, 'p1', (1800, 1, 9.0), (0, 2, 0.0)),
+    'duo_p1':      (2, 'p1', (2400, 3, 12.0), (2300, 1, 8.0)),
+    'duo_p2':      (2, 'p2', (2400, 3, 12.0), (2300, 1, 8.0)),
+}
+VARIANTS = ('python', 'leap', 'numpy', 'rle')
+
+def arena_map():
+    grid, layers = mapView110.prepare_map(generate(200, SEED), SEED)
+    return grid, layers['dist']
+
+def render_arena(variant, grid, dist):
+    mv = mapView110
+    mv.MAP_SIZE, mv.RAY_BACKEND = len(grid), 'numpy' if variant == 'numpy' else 'python'
+    mv.background_layers.clear(); mv.view_buffers.clear()
+    if variant == 'numpy': ray_grid, grid_np, ray_field = grid.tolist(), grid, dist
+    elif variant == 'rle': ray_grid, grid_np, ray_field = RLEGrid.from_rows(grid), None, dist.tolist()
+    elif variant == 'leap': ray_grid, grid_np, ray_field = grid.tolist(), None, dist.tolist()
+    else: ray_grid, grid_np, ray_field = grid.tolist(), None, None
+    random.seed(SEED)
+    clouds = [mv.WorldCloud() for _ in range(15)]
+    frames = {}
+    for name, (obs_pose, target_pose) in ARENA_POSES.items():
+        obs = mv.Player("Blue", obs_pose[0], obs_pose[1], (0, 120, 255), [], (0, 255, 255))
+        target = mv.Player("Red", target_pose[0], target_pose[1], (240, 30, 30), [], (255, 0, 255))
+        obs.angle, target.angle = obs_pose[2], target_pose[2]
+        rockets = [mv.Rocket(obs.x + math.cos(obs.angle + d) * r, obs.z + math.sin(obs.angle + d) * r, obs.angle, c)
+                   for d, r, c in ((0.1, 6, (0, 255, 255)), (-0.2, 12, (255, 0, 255)))]
+        screen = pygame.Surface((VIEW_W * 2, VIEW_H))
+        mv.draw_arena(screen, obs, target, ray_grid, 0, clouds, VIEW_W * 2, VIEW_H, rockets, grid_np, ray_field)
+        frames[f"arena_{name}"] = screen.subsurface((0, 0, VIEW_W, VIEW_H)).copy()
+    return frames
+
+def render_roller():
+    game = rollerGame54.RollerGame()
+    frames = {}
+    for name, (humans, viewer, p1, p2) in ROLLER_POSES.items():
+        game.num_humans = humans
+        game.setup_race(SEED)
+        for rider, (z, lane, speed) in ((game.p1, p1), (game.p2, p2)):
+            rider.z, rider.lane_idx, rider.speed = z, lane, speed
+        frames[f"roller_{name}"] = game.draw_view(getattr(game, viewer))
+    return frames
+
+def compare(frame, golden):
+    # Fraction of pixels with any channel off by more than CHANNEL_TOL
+    if frame.get_size() != golden.get_size(): return 1.0
+    a, b = pygame.image.tobytes(frame, "RGB"), pygame.image.tobytes(golden, "RGB")
+    bad = sum(1 for i in range(0, len(a), 3)
+              if abs(a[i] - b[i]) > CHANNEL_TOL or abs(a[i + 1] - b[i + 1]) > CHANNEL_TOL or abs(a[i + 2] - b[i + 2]) > CHANNEL_TOL)
+    return bad / (len(a) // 3)
+
+fail_dir = None # temp dir for failing frames, created on the first failure
+
+def check(name, frame):
+    global fail_dir
+    path = os.path.join(GOLDEN_DIR, name + ".png")
+    if not os.path.exists(path):
+        print(f"  {name}: no golden (run with --update)"); return False
+    diff = compare(frame, pygame.image.load(path))
+    ok = diff <= PIXEL_TOL
+    print(f"  {name}: {diff * 100:.3f}% pixels differ {'ok' if ok else 'FAIL'}")
+    if not ok:
+        if fail_dir is None: fail_dir = tempfile.mkdtemp(prefix="golden_fail_")
+        pygame.image.save(frame, os.path.join(fail_dir, name + ".png"))
+    return ok
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Render fixed poses and compare them with golden/*.png")
+    ap.add_argument("--update", action="store_true", help="rewrite the goldens from the Python reference renderer")
+    ap.add_argument("--variant", nargs="+", default=[v for v in VARIANTS if v != 'numpy' or mapView110.np is not None])
+    args = ap.parse_args()
+    pygame.init(); pygame.display.set_mode((VIEW_W * 2, VIEW_H))
+    grid, dist = arena_map()
+    if args.update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        frames = dict(render_arena('python', grid, dist), **render_roller())
+        for name, frame in frames.items(): pygame.image.save(frame, os.path.join(GOLDEN_DIR, name + ".png"))
+        print(f"Wrote {len(frames)} goldens to {GOLDEN_DIR}")
+        sys.exit()
+    ok = True
+    for variant in args.variant:
+        print(f"arena [{variant}]")
+        for name, frame in render_arena(variant, grid, dist).items(): ok &= check(name, frame)
+    print("roller")
+    for name, frame in render_roller().items(): ok &= check(name, frame)
+    if fail_dir: print(f"Failing frames saved to {fail_dir}")
+    sys.exit(0 if ok else 1)
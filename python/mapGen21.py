@@ -1,5 +1,6 @@
 import json
 import random
+from arenaMap import distance_field, save_arena
 
 def generate_mega_arena(size=200):
     # Initialize with Grass (2)
@@ -19,9 +20,11 @@ def generate_mega_arena(size=200):
         if grid[rx][rz] == 0:
             grid[rx][rz] = 4
 
+    dist = distance_field(grid)
     data = {"grid": grid, "size": size}
     with open("mega_arena.json", "w") as f:
         json.dump(data, f)
+    save_arena("mega_arena.arena", grid, dist=dist)
     print("Mega Arena Generated!")
 
 generate_mega_arena()
\ No newline at end of file
@@ -1,6 +1,7 @@
 import json
 import math
 import random
+from arenaMap import distance_field, save_arena
 
 MAP_SIZE = 200
 grid = [[0 for _ in range(MAP_SIZE)] for _ in range(MAP_SIZE)]
@@ -45,5 +46,7 @@ add_circle(100, 100, 10, 3)      # Small pillar
 for _ in range(10): # Random debris
     add_circle(random.randint(10,190), random.randint(10,190), random.randint(2,8), 4)
 
+dist = distance_field(grid)
 with open("mega_arena.json", "w") as f:
-    json.dump({'grid': grid}, f)
\ No newline at end of file
+    json.dump({'grid': grid}, f)
+save_arena("mega_arena.arena", grid, dist=dist)
\ No newline at end of file
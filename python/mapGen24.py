@@ -0,0 +1,126 @@
+import argparse
+import json
+import math
+import random
+import time
+import numpy as np
+from arenaMap import distance_field, save_arena
+
+# Same primitives as mapGen23, but as NumPy mask operations on a uint8 grid[x][z]
+# so maps of any size can be generated. Each shape only touches its bounding box.
+
+def add_circle(grid, cx, cz, r, val=4):
+    x0, x1 = max(0, cx - r), min(grid.shape[0], cx + r + 1)
+    z0, z1 = max(0, cz - r), min(grid.shape[1], cz + r + 1)
+    if x0 >= x1 or z0 >= z1: return
+    dx, dz = np.ogrid[x0 - cx:x1 - cx, z0 - cz:z1 - cz]
+    grid[x0:x1, z0:z1][dx * dx + dz * dz <= r * r] = val
+
+def add_ellipse(grid, cx, cz, rx, rz, angle, val=5):
+    r = max(rx, rz)
+    x0, x1 = max(0, cx - r), min(grid.shape[0], cx + r + 1)
+    z0, z1 = max(0, cz - r), min(grid.shape[1], cz + r + 1)
+    if x0 >= x1 or z0 >= z1: return
+    dx, dz = np.ogrid[x0 - cx:x1 - cx, z0 - cz:z1 - cz]
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    # Rotated ellipse math
+    x_rot = dx * cos_a + dz * sin_a
+    z_rot = -dx * sin_a + dz * cos_a
+    grid[x0:x1, z0:z1][(x_rot**2 / rx**2) + (z_rot**2 / rz**2) <= 1] = val
+
+def blob_points(cx, cz, size, nodes=6, rng=random):
+    # Random star-shaped outline around (cx, cz), like mapGen23.add_blob
+    points = []
+    for n in range(nodes):
+        ang = (n / nodes) * math.pi * 2
+        r = size * rng.uniform(0.5, 1.2)
+        points.append((cx + math.cos(ang) * r, cz + math.sin(ang) * r))
+    return points
+
+# --- Scanline Polygon Fill ---
+# Classic edge table + active edge list. Scanlines run along x (one per grid row,
+# sampled at cell centers); each edge is bucketed by the first row it reaches, moves
+# into the active list there and steps its z by its slope each row. Any number of
+# polygons share the one sweep: the active edges are sorted by (polygon, z) and
+# paired per polygon (even-odd), and each pair fills one contiguous span.
+# Works on a NumPy grid or a list-of-lists grid.
+def fill_polygons(grid, polygons, vals):
+    size_x, size_z = len(grid), len(grid[0])
+    edge_table = {}
+    for poly, points in enumerate(polygons):
+        for (ax, az), (bx, bz) in zip(points, points[1:] + points[:1]):
+            if ax == bx: continue
+            if ax > bx: ax, az, bx, bz = bx, bz, ax, az
+            row = max(0, math.ceil(ax - 0.5))
+            if row + 0.5 >= bx or row >= size_x: continue
+            slope = (bz - az) / (bx - ax)
+            edge_table.setdefault(row, []).append([bx, az + (row + 0.5 - ax) * slope, slope, poly])
+    if not edge_table: return
+    is_np = hasattr(grid, 'shape')
+    active = []
+    for row in range(min(edge_table), size_x):
+        active.extend(edge_table.get(row, ()))
+        active = [e for e in active if row + 0.5 < e[0]]
+        if not active:
+            if row > max(edge_table): break
+            continue
+        active.sort(key=lambda e: (e[3], e[1]))
+        for left, right in zip(active[::2], active[1::2]):
+            z0, z1 = max(0, math.ceil(left[1] - 0.5)), min(size_z, math.ceil(right[1] - 0.5))
+            if z0 < z1:
+                val = vals[left[3]]
+                if is_np: grid[row, z0:z1] = val
+                else: grid[row][z0:z1] = [val] * (z1 - z0)
+        for e in active: e[1] += e[2]
+
+def add_blob(grid, cx, cz, size, nodes=6, val=6, rng=random):
+    fill_polygons(grid, [blob_points(cx, cz, size, nodes, rng)], [val])
+
+def add_blobs(grid, blobs, rng=random):
+    # blobs: (cx, cz, size, nodes, val) tuples, all rasterized in one sweep
+    fill_polygons(grid, [blob_points(cx, cz, size, nodes, rng) for cx, cz, size, nodes, val in blobs], [b[4] for b in blobs])
+
+def add_debris(grid, centers, radii, val=4):
+    # Many small circles at once: one precomputed disk of offsets per radius,
+    # stamped at every center with that radius in a single fancy-index write.
+    centers, radii = np.asarray(centers), np.asarray(radii)
+    for r in np.unique(radii):
+        dx, dz = np.nonzero(np.add.outer(np.arange(-r, r + 1)**2, np.arange(-r, r + 1)**2) <= r * r)
+        pts_x = (centers[radii == r, 0][:, None] + dx - r).ravel()
+        pts_z = (centers[radii == r, 1][:, None] + dz - r).ravel()
+        keep = (pts_x >= 0) & (pts_x < grid.shape[0]) & (pts_z >= 0) & (pts_z < grid.shape[1])
+        grid[pts_x[keep], pts_z[keep]] = val
+
+def generate(size=200, seed=None):
+    # mapGen23's layout scaled to `size`: the landmarks grow with the map, debris
+    # and blobs keep the same density per area.
+    rng = random.Random(seed)
+    nrng = np.random.default_rng(seed)
+    grid = np.zeros((size, size), dtype=np.uint8)
+    k = size / 200
+    add_circle(grid, int(50 * k), int(50 * k), int(15 * k), 4)                 # Large Cylinder
+    add_ellipse(grid, int(150 * k), int(150 * k), int(30 * k), int(10 * k), 0.8, 5) # Slanted Monolith
+    add_circle(grid, int(100 * k), int(100 * k), max(1, int(10 * k)), 3)       # Small pillar
+    n_debris, n_blobs = max(1, int(10 * k * k)), max(1, int(3 * k * k))
+    add_debris(grid, nrng.integers(10, max(11, size - 10), (n_debris, 2)), nrng.integers(2, 9, n_debris), 4)
+    add_blobs(grid, [(rng.randint(10, max(10, size - 10)), rng.randint(10, max(10, size - 10)), rng.randint(4, 12), rng.randint(5, 9), 6)
+                     for _ in range(n_blobs)], rng)
+    return grid
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Generate an arena map of any size")
+    ap.add_argument("--size", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--out", default="mega_arena.arena")
+    ap.add_argument("--json", action="store_true", help="also write mega_arena.json (slow and huge for big maps)")
+    args = ap.parse_args()
+    start = time.perf_counter()
+    grid = generate(args.size, args.seed)
+    gen_t = time.perf_counter()
+    dist = distance_field(grid)
+    save_arena(args.out, grid, dist=dist)
+    if args.json:
+        with open("mega_arena.json", "w") as f:
+            json.dump({'grid': grid.tolist()}, f)
+    end = time.perf_counter()
+    print(f"{args.size}x{args.size} arena -> {args.out}: generate {gen_t - start:.3f}s, distance field + write {end - gen_t:.3f}s")
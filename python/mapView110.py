@@ -4,16 +4,47 @@ import math
 import random
 import serial
 import threading
-import array
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from arenaMap import distance_field, load_arena, compiled_arena
+from worldTiles import TileWorld, cast_ray as cast_ray_tiles
+from rleGrid import RLEGrid, cast_ray as cast_ray_rle
+from frameTimer import NULL_TIMER, FrameProfiler, StageTimer
+from adaptiveQuality import QualityController
+from renderTarget import RenderTarget
+from qualityPresets import configure
+from soundBank import SoundBank, CACHE_FILE
+from voiceManager import VoiceManager
+from positionalAudio import PositionalAudio
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # --- Config ---
 res_w, res_h = 1200, 600
 FPS = 60
 FOV = math.pi / 3
 NUM_RAYS = 240 
+RAY_BACKEND = 'python' # 'python' or 'numpy' (casts every column of a view in one batched call)
 DRAW_DIST = 1000 
-MAP_SIZE = 200
+RAY_STEP = 0.2 # DRAW_DIST * RAY_STEP = max ray length in cells
+RENDER_SCALE = 1.0 # viewports render at this fraction of their window size and are scaled up
+UPSCALE_FILTER = 'nearest' # 'nearest', 'smooth', 'integer' or 'direct' (renderTarget.py)
+ADAPTIVE_QUALITY = True # step NUM_RAYS / DRAW_DIST / RENDER_SCALE through QUALITY_LEVELS to hold FPS
+QUALITY_LEVELS = [ # (NUM_RAYS, DRAW_DIST, RENDER_SCALE), lowest first; clamped to the values above, which are the top level
+    (80, 400, 0.5), (120, 500, 0.5), (160, 600, 0.75), (200, 800, 0.75),
+    (240, 1000, 1.0), (360, 1000, 1.0), (480, 1000, 1.0),
+]
+MAP_SIZE = 200 # replaced by the loaded map's size
+ARENA_FILE, JSON_FILE = "mega_arena.arena", "mega_arena.json"
+WORLD_DIR = "mega_arena_world" # tiled world (worldTiles.py split); used instead of the arena files if present
+GRID_STORAGE = 'dense' # 'dense' or 'rle' (run-length rows/columns, for huge sparse maps)
+MAP_SEED = 1 # wall recolor seed; the prepared map is cached per (map, seed)
+MAP_PREP_VERSION = 1 # bump when prepare_map changes to invalidate cached maps
+RENDER_WORKERS = 1 # viewports rendered concurrently; 1 = one after the other (see draw_split before raising it)
+CLOUD_COUNT = 15
 PROXIMITY_RANGE = 3.5 
 
 # --- Wall Colors ---
@@ -23,6 +54,9 @@ WALL_COLORS = {
     5: (80, 80, 200),   # Blue
     6: (180, 60, 60)    # Red
 }
+FOG_DIST = 180 # walls fade to 10% brightness towards this distance
+SIDE_SHADE = (1.0, 0.8) # E/W faces, N/S faces
+SHADE_STEPS = 2 # distance buckets per cell
 
 # --- SERIAL CONFIG ---
 SERIAL_PORT_1 = 'COM4' 
@@ -34,19 +68,6 @@ SENSITIVITY = 0.05
 SUN_AZIMUTH = math.radians(45)
 SUN_ELEVATION = 0.55 
 
-def create_sound(freq_start, freq_end, duration, noise=False):
-    sample_rate = 44100
-    n_samples = int(sample_rate * duration)
-    buf = array.array('h', [0] * n_samples)
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        frac = i / n_samples
-        freq = freq_start + (freq_end - freq_start) * frac
-        val = random.uniform(-1, 1) if noise else math.sin(2 * math.pi * freq * t)
-        fade = (1.0 - frac)
-        buf[i] = int(val * 32767 * 0.3 * fade)
-    return pygame.mixer.Sound(buf)
-
 class Rocket:
     def __init__(self, x, z, angle, color):
         self.x, self.z = x, z
@@ -54,10 +75,14 @@ class Rocket:
         self.speed = 2.8
         self.color = color
 
-    def update(self, grid, target):
-        self.x += math.cos(self.angle) * self.speed
-        self.z += math.sin(self.angle) * self.speed
-        if not (0 < self.x < MAP_SIZE and 0 < self.z < MAP_SIZE) or grid[int(self.x)][int(self.z)] >= 3:
+    def update(self, grid, target, field=None):
+        cos_a, sin_a = math.cos(self.angle), math.sin(self.angle)
+        tiled = isinstance(grid, TileWorld)
+        crossed = (cast_ray_tiles if tiled else cast_ray)(grid, self.x, self.z, cos_a, sin_a, self.speed, field)
+        self.x += cos_a * self.speed
+        self.z += sin_a * self.speed
+        if crossed or not (0 < self.x < MAP_SIZE and 0 < self.z < MAP_SIZE): return "hit_wall"
+        if (grid.get(int(self.x), int(self.z)) if tiled else grid[int(self.x)][int(self.z)]) >= 3:
             return "hit_wall"
         dist = math.sqrt((self.x - target.x)**2 + (self.z - target.z)**2)
         if dist < PROXIMITY_RANGE:
@@ -89,7 +114,7 @@ class Player:
                 if line == "1": self.pulses += 1
         except: pass
 
-    def update(self, keys, grid, sounds, opponent):
+    def update(self, keys, grid, sounds, opponent, field=None):
         if keys[self.controls[2]]: self.angle -= 0.08
         if keys[self.controls[3]]: self.angle += 0.08
         kb_boost = 4 if keys[self.controls[0]] else 0
@@ -98,66 +123,267 @@ class Player:
         if keys[self.controls[1]] and self.fire_cooldown <= 0:
             spawn_x, spawn_z = self.x + math.cos(self.angle)*3, self.z + math.sin(self.angle)*3
             self.rockets.append(Rocket(spawn_x, spawn_z, self.angle, self.laser_color))
-            sounds['whoosh'].play(); self.fire_cooldown = 20
+            sounds.play('whoosh', spawn_x, spawn_z, self.name); self.fire_cooldown = 20
         if self.fire_cooldown > 0: self.fire_cooldown -= 1
         nx, nz = self.x + math.cos(self.angle)*self.speed, self.z + math.sin(self.angle)*self.speed
         if 1 < nx < MAP_SIZE-1 and 1 < nz < MAP_SIZE-1:
             if grid[int(nx)][int(nz)] < 3: self.x, self.z = nx, nz
             else: self.speed *= -0.5
         for r in self.rockets[:]:
-            res = r.update(grid, opponent)
+            res = r.update(grid, opponent, field)
             if res:
-                sounds['hit'].play(); self.rockets.remove(r)
+                sounds.play('hit', r.x, r.z, self.name, 'impact'); self.rockets.remove(r)
                 if res == "hit_player": self.score += 1
 
-def draw_custom_rider(screen, bx, by, sprite_h, target, obs):
+# --- DDA Raycaster (Amanatides-Woo) ---
+# Visits every cell the ray crosses exactly once. Returns (t, val, side, offset):
+# t = distance along the ray, side 0 = hit an E/W face (x boundary), 1 = N/S face
+# (z boundary), offset = 0..1 position of the hit along that face. None if nothing
+# within max_t. Anything outside the map counts as wall 3.
+# With a distance field (arenaMap.distance_field) the ray leaps across open floor:
+# from a cell at distance d >= LEAP_MIN it jumps just under d-1 cells along its major
+# axis (all guaranteed empty) and restarts the DDA there.
+LEAP_MIN = 3
+
+def cast_ray(grid, ox, oz, cos_a, sin_a, max_t, field=None):
+    leap = 1 / max(abs(cos_a), abs(sin_a))
+    t0, px, pz = 0.0, ox, oz
+    while True:
+        cx, cz = int(px), int(pz)
+        if cos_a > 0: step_x, delta_x = 1, 1 / cos_a; side_x = t0 + (cx + 1 - px) * delta_x
+        elif cos_a < 0: step_x, delta_x = -1, -1 / cos_a; side_x = t0 + (px - cx) * delta_x
+        else: step_x, delta_x, side_x = 0, float('inf'), float('inf')
+        if sin_a > 0: step_z, delta_z = 1, 1 / sin_a; side_z = t0 + (cz + 1 - pz) * delta_z
+        elif sin_a < 0: step_z, delta_z = -1, -1 / sin_a; side_z = t0 + (pz - cz) * delta_z
+        else: step_z, delta_z, side_z = 0, float('inf'), float('inf')
+        t = t0
+        while True:
+            if field is not None and 0 <= cx < MAP_SIZE and 0 <= cz < MAP_SIZE:
+                d = field[cx][cz]
+                if d >= LEAP_MIN: break
+            if side_x < side_z:
+                t, side = side_x, 0
+                side_x += delta_x; cx += step_x
+            else:
+                t, side = side_z, 1
+                side_z += delta_z; cz += step_z
+            if t > max_t: return None
+            val = grid[cx][cz] if (0 <= cx < MAP_SIZE and 0 <= cz < MAP_SIZE) else 3
+            if val >= 3:
+                offset = (oz + t * sin_a) % 1 if side == 0 else (ox + t * cos_a) % 1
+                return t, val, side, offset
+        t0 = t + (d - 1.01) * leap
+        if t0 > max_t: return None
+        px, pz = ox + t0 * cos_a, oz + t0 * sin_a
+
+# --- NumPy Raycaster ---
+# Same hits as cast_ray for a whole batch of rays. Instead of stepping, every
+# x-boundary crossing and every z-boundary crossing of every ray is computed as an
+# array; the first wall among each set wins. Crossings are taken in blocks so rays
+# that hit early stop costing anything. With a distance field, every ray first
+# takes up to LEAP_ITERS leaps across open floor. Returns (t, val, side, offset) arrays,
+# t = inf where nothing was hit within max_t.
+RAY_BLOCK = 32
+LEAP_ITERS = 8
+
+def cast_rays_np(grid_np, ox, oz, cos_a, sin_a, max_t, field_np=None):
+    n = len(cos_a)
+    size = grid_np.shape[0]
+    t0 = np.zeros(n)
+    if field_np is not None:
+        # Vectorized version of cast_ray's leaps, done up front for every ray.
+        leap = 1 / np.maximum(np.abs(cos_a), np.abs(sin_a))
+        for _ in range(LEAP_ITERS):
+            cx, cz = np.floor(ox + t0 * cos_a).astype(np.int64), np.floor(oz + t0 * sin_a).astype(np.int64)
+            inside = (cx >= 0) & (cx < size) & (cz >= 0) & (cz < size)
+            d = np.zeros(n)
+            d[inside] = field_np[cx[inside], cz[inside]]
+            jump = np.where(d >= LEAP_MIN, (d - 1.01) * leap, 0)
+            if not jump.any(): break
+            t0 += jump
+    best_t, best_val, best_side = np.full(n, np.inf), np.zeros(n, np.uint8), np.zeros(n, np.int8)
+    for side, o_main, o_cross, d_main, d_cross in ((0, ox, oz, cos_a, sin_a), (1, oz, ox, sin_a, cos_a)):
+        step = np.where(d_main > 0, 1, -1)
+        p_main = o_main + t0 * d_main
+        cell0 = np.floor(p_main).astype(np.int64)
+        rays = np.nonzero(d_main)[0]
+        delta = np.ones(n)
+        delta[rays] = np.abs(1 / d_main[rays])
+        first = t0 + np.where(d_main > 0, cell0 + 1 - p_main, p_main - cell0) * delta
+        start = 0
+        while rays.size:
+            k = np.arange(start, start + RAY_BLOCK)
+            t = first[rays, None] + k[None, :] * delta[rays, None]
+            main = cell0[rays, None] + (k[None, :] + 1) * step[rays, None]
+            cross = np.floor(o_cross + t * d_cross[rays, None]).astype(np.int64)
+            if side == 0: mx, mz = main, cross
+            else: mx, mz = cross, main
+            inside = (mx >= 0) & (mx < size) & (mz >= 0) & (mz < size)
+            cells = np.full(t.shape, 3, np.uint8)
+            cells[inside] = grid_np[mx[inside], mz[inside]]
+            wall = (cells >= 3) & (t <= max_t)
+            hit = wall.any(axis=1)
+            j = wall.argmax(axis=1)
+            hit_rays, hit_j = rays[hit], j[hit]
+            hit_t = t[hit, hit_j]
+            better = hit_t < best_t[hit_rays]
+            best_t[hit_rays[better]] = hit_t[better]
+            best_val[hit_rays[better]] = cells[hit, hit_j][better]
+            best_side[hit_rays[better]] = side
+            # keep going only for rays whose block ended before max_t and before a known hit
+            last_t = t[:, -1]
+            alive = ~hit & (last_t <= max_t) & (last_t < best_t[rays])
+            rays = rays[alive]
+            start += RAY_BLOCK
+    with np.errstate(invalid='ignore'):
+        offset = np.where(best_side == 0, oz + best_t * sin_a, ox + best_t * cos_a) % 1
+    return best_t, best_val, best_side, offset
+
+# --- Ray Tables ---
+# Per-column angle offsets from the view direction, their cos/sin, and the fisheye
+# factor (= cos of the offset), cached per (FOV, ray count). A player's heading is
+# applied to them as a rotation, so no trig runs per ray. A changed FOV or NUM_RAYS
+# simply picks up (or builds) another table.
+class RayTable:
+    def __init__(self, fov, num_rays):
+        self.offsets = [-fov/2 + i * (fov / num_rays) for i in range(num_rays)]
+        self.cos_off = [math.cos(o) for o in self.offsets]
+        self.sin_off = [math.sin(o) for o in self.offsets]
+        self.fisheye = self.cos_off
+        if np is not None:
+            self.cos_np, self.sin_np = np.array(self.cos_off), np.array(self.sin_off)
+
+ray_tables = {}
+
+def get_ray_table(fov, num_rays):
+    table = ray_tables.get((fov, num_rays))
+    if table is None:
+        table = ray_tables[(fov, num_rays)] = RayTable(fov, num_rays)
+    return table
+
+def cast_view(grid, obs, grid_np=None, field=None):
+    # Perpendicular (fisheye-corrected) distance, wall value and hit side per column.
+    max_t = DRAW_DIST * RAY_STEP
+    rt = get_ray_table(FOV, NUM_RAYS)
+    ca, sa = math.cos(obs.angle), math.sin(obs.angle)
+    if grid_np is not None:
+        cos_a, sin_a = ca * rt.cos_np - sa * rt.sin_np, sa * rt.cos_np + ca * rt.sin_np
+        t, vals, sides, _ = cast_rays_np(grid_np, obs.x, obs.z, cos_a, sin_a, max_t, field)
+        dists = np.maximum(0.5, t * rt.cos_np)
+        return dists.tolist(), vals.tolist(), sides.tolist()
+    z_buffer, vals, sides = [float('inf')] * NUM_RAYS, [0] * NUM_RAYS, [0] * NUM_RAYS
+    cos_off, sin_off, fisheye = rt.cos_off, rt.sin_off, rt.fisheye
+    cast = cast_ray_rle if isinstance(grid, RLEGrid) else cast_ray_tiles if isinstance(grid, TileWorld) else cast_ray
+    for i in range(NUM_RAYS):
+        co, so = cos_off[i], sin_off[i]
+        hit = cast(grid, obs.x, obs.z, ca * co - sa * so, sa * co + ca * so, max_t, field)
+        if hit:
+            t, vals[i], sides[i], _ = hit
+            z_buffer[i] = max(0.5, t * fisheye[i])
+    return z_buffer, vals, sides
+
+# --- Wall Shading LUT ---
+# SHADE_LUT[val][side][bucket] -> fogged, side-shaded color, with bucket =
+# int(dist * SHADE_STEPS). Built once from WALL_COLORS; unknown values use gold.
+def build_shade_lut(base):
+    fogs = [max(0.1, min(1, 1 - (b / SHADE_STEPS) / FOG_DIST)) for b in range(FOG_DIST * SHADE_STEPS + 1)]
+    return [[tuple(int(c * fog * shade) for c in base) for fog in fogs] for shade in SIDE_SHADE]
+
+SHADE_LUT = {val: build_shade_lut(color) for val, color in WALL_COLORS.items()}
+SHADE_DEFAULT = build_shade_lut((200, 160, 20))
+
+# --- View Compositor ---
+# Each viewport is composed in its own persistent surface (sky, walls, sprites) and
+# pushed to the screen with a single blit. Wall columns are plain Surface.fill spans
+# into that buffer rather than one draw.rect each on the clipped screen. Buffers are
+# only reallocated when the viewport size changes.
+# A view rendered below window size is scaled up through its slot's RenderTarget.
+view_buffers = {}
+render_targets = {}
+
+def get_view_buffer(slot, w, h):
+    view = view_buffers.get(slot)
+    if view is None or view.get_size() != (w, h):
+        view = pygame.Surface((w, h)).convert()
+        view_buffers[slot] = view
+    return view
+
+def get_render_target(slot):
+    target = render_targets.get(slot)
+    if target is None or target.upscale != UPSCALE_FILTER:
+        target = render_targets[slot] = RenderTarget(UPSCALE_FILTER)
+    return target
+
+def draw_walls(view, cur_h, z_buffer, vals, sides):
+    n = len(z_buffer); ray_w = view.get_width() / n; col_w = math.ceil(ray_w)
+    last = len(SHADE_DEFAULT[0]) - 1
+    for i in range(n):
+        dist = z_buffer[i]
+        if dist != float('inf'):
+            wall_h = (cur_h / (dist + 0.001)) * 1.8
+            color = SHADE_LUT.get(vals[i], SHADE_DEFAULT)[sides[i]][min(last, int(dist * SHADE_STEPS))]
+            view.fill(color, (i * ray_w, (cur_h - wall_h) // 2, col_w, wall_h))
+
+# --- Background Cache ---
+# Sky gradient and ground band depend only on the viewport size, so they are
+# rendered once per (w, h) and each frame starts with one blit. main() clears the
+# cache on VIDEORESIZE and fullscreen toggles.
+background_layers = {}
+
+def get_background(w, h):
+    bg = background_layers.get((w, h))
+    if bg is None:
+        bg = pygame.Surface((w, h)).convert()
+        horizon = h // 2
+        pygame.draw.rect(bg, (20, 85, 20), (0, horizon, w, horizon))
+        for i in range(horizon):
+            pygame.draw.line(bg, (25, 110 + (i*200//h), 210), (0, i), (w, i))
+        background_layers[(w, h)] = bg
+    return bg
+
+def draw_custom_rider(screen, bx, by, sprite_h, target, obs, scale=1.0):
     dx, dz = target.x - obs.x, target.z - obs.z
     angle_to_cam = math.atan2(dz, dx)
     rel_angle = target.angle - angle_to_cam
     aspect = abs(math.cos(rel_angle))
-    base_w, body_h = max(20, int(45 * (0.5 + 0.5 * aspect))), max(18, sprite_h // 2.2)
+    base_w, body_h = max(int(20 * scale), int(45 * scale * (0.5 + 0.5 * aspect))), max(18 * scale, sprite_h // 2.2)
     pygame.draw.ellipse(screen, target.color, (bx - base_w//2, by, base_w, body_h))
-    h_size, radius = max(5, body_h // 6), base_w // 1.4
+    h_size, radius = max(5 * scale, body_h // 6), base_w // 1.4
     rhx, rhy = bx + math.cos(rel_angle + 1.57)*radius, by + body_h/2 + math.sin(rel_angle + 1.57)*(radius/4)
     pygame.draw.circle(screen, (50, 255, 120), (int(rhx), int(rhy)), int(h_size))
     lhx, lhy = bx + math.cos(rel_angle - 1.57)*radius, by + body_h/2 + math.sin(rel_angle - 1.57)*(radius/4)
     pygame.draw.circle(screen, (50, 120, 255), (int(lhx), int(lhy)), int(h_size))
 
-def draw_arena(screen, obs, target, grid, x_offset, clouds, cur_w, cur_h, all_rockets):
-    view_w = cur_w // 2; screen.set_clip(pygame.Rect(x_offset, 0, view_w, cur_h))
+def render_view(obs, target, grid, slot, clouds, cur_w, cur_h, all_rockets, grid_np=None, field=None, timer=NULL_TIMER):
+    # One player's viewport into its own buffer (keyed by slot, its x offset). Only
+    # reads shared state, so both viewports can render at the same time. Renders at
+    # the slot's internal resolution (RENDER_SCALE, UPSCALE_FILTER); draw_arena /
+    # draw_split scale it up.
+    out_h = cur_h
+    view_w, cur_h = get_render_target(slot).internal_size(cur_w // 2, cur_h, RENDER_SCALE); cur_w = view_w * 2
+    scale = cur_h / out_h
+    view = get_view_buffer(slot, view_w, cur_h)
     horizon = cur_h // 2
-    pygame.draw.rect(screen, (20, 85, 20), (x_offset, horizon, view_w, horizon))
-    for i in range(horizon):
-        pygame.draw.line(screen, (25, 110 + (i*200//cur_h), 210), (x_offset, i), (x_offset + view_w, i))
+    view.blit(get_background(view_w, cur_h), (0, 0))
     
     sun_rel = math.atan2(math.sin(SUN_AZIMUTH - obs.angle), math.cos(SUN_AZIMUTH - obs.angle))
     if abs(sun_rel) < FOV:
-        sx = x_offset + (sun_rel/FOV + 0.5) * view_w
-        pygame.draw.circle(screen, (255, 255, 210), (int(sx), int(horizon - (SUN_ELEVATION*(cur_h//2.5)))), int(cur_h/15))
+        sx = (sun_rel/FOV + 0.5) * view_w
+        pygame.draw.circle(view, (255, 255, 210), (int(sx), int(horizon - (SUN_ELEVATION*(cur_h//2.5)))), int(cur_h/15))
     for c in clouds:
         cdx, cdz = c.world_x - obs.x, c.world_z - obs.z
         c_dist = math.sqrt(cdx**2 + cdz**2)
         c_ang = math.atan2(cdz, cdx) - obs.angle
         c_ang = math.atan2(math.sin(c_ang), math.cos(c_ang))
         if abs(c_ang) < FOV * 1.5:
-            cx, cy = x_offset + (c_ang/FOV + 0.5) * view_w, (cur_h // 2.5) - (c.altitude/(c_dist*0.02 + 1.2))
-            pygame.draw.ellipse(screen, (245, 245, 250), (cx - cur_w//12, cy, cur_w//6, cur_h//12))
+            cx, cy = (c_ang/FOV + 0.5) * view_w, (cur_h // 2.5) - (c.altitude*scale/(c_dist*0.02 + 1.2))
+            pygame.draw.ellipse(view, (245, 245, 250), (cx - cur_w//12, cy, cur_w//6, cur_h//12))
+    timer.mark('sky')
 
-    z_buffer = [float('inf')] * NUM_RAYS
-    ray_w = view_w / NUM_RAYS
-    for i in range(NUM_RAYS):
-        ray_angle = obs.angle - FOV/2 + i * (FOV / NUM_RAYS)
-        cos_a, sin_a = math.cos(ray_angle), math.sin(ray_angle)
-        for d in range(1, DRAW_DIST):
-            tx, tz = obs.x + d * 0.2 * cos_a, obs.z + d * 0.2 * sin_a
-            val = grid[int(tx)][int(tz)] if (0 < tx < MAP_SIZE and 0 < tz < MAP_SIZE) else 3
-            if val >= 3:
-                dist = d * 0.2 * math.cos(obs.angle - ray_angle)
-                dist = max(0.5, dist)
-                z_buffer[i], wall_h = dist, (cur_h / (dist + 0.001)) * 1.8
-                fog = max(0.1, min(1, 1 - (dist / 180)))
-                pygame.draw.rect(screen, [int(c * fog) for c in WALL_COLORS.get(val, (200, 160, 20))], (x_offset + (i * ray_w), (cur_h - wall_h) // 2, math.ceil(ray_w), wall_h))
-                break
+    z_buffer, vals, sides = cast_view(grid, obs, grid_np, field)
+    timer.mark('raycast')
+    draw_walls(view, cur_h, z_buffer, vals, sides)
+    timer.mark('walls')
 
     for r in all_rockets:
         rdx, rdz = r.x - obs.x, r.z - obs.z
@@ -167,50 +393,151 @@ def draw_arena(screen, obs, target, grid, x_offset, clouds, cur_w, cur_h, all_ro
         if abs(rang) < FOV:
             idx = max(0, min(NUM_RAYS-1, int((rang/FOV + 0.5)*NUM_RAYS)))
             if rdist < z_buffer[idx]:
-                rx = x_offset + (rang/FOV + 0.5) * view_w
-                pygame.draw.circle(screen, r.color, (int(rx), horizon), max(4, int(cur_h/(rdist+0.001))//4))
+                rx = (rang/FOV + 0.5) * view_w
+                pygame.draw.circle(view, r.color, (int(rx), horizon), max(4, int(cur_h/(rdist+0.001))//4))
 
     dx, dz = target.x - obs.x, target.z - obs.z
     t_dist, t_ang = math.sqrt(dx*dx + dz*dz), math.atan2(dz, dx) - obs.angle
     t_ang = math.atan2(math.sin(t_ang), math.cos(t_ang))
     if abs(t_ang) < FOV:
-        tx_s = x_offset + (t_ang / FOV + 0.5) * view_w
-        pygame.draw.line(screen, target.laser_color, (int(tx_s), 0), (int(tx_s), horizon), 3)
+        tx_s = (t_ang / FOV + 0.5) * view_w
+        pygame.draw.line(view, target.laser_color, (int(tx_s), 0), (int(tx_s), horizon), max(1, int(3 * scale)))
         idx = max(0, min(NUM_RAYS - 1, int((t_ang / FOV + 0.5) * NUM_RAYS)))
         if t_dist < z_buffer[idx] + 8: 
-            draw_custom_rider(screen, tx_s, horizon, cur_h/(t_dist+0.001), target, obs)
-    screen.set_clip(None)
+            draw_custom_rider(view, tx_s, horizon, cur_h/(t_dist+0.001), target, obs, scale)
+    timer.mark('sprites')
+    return view
+
+def draw_arena(screen, obs, target, grid, x_offset, clouds, cur_w, cur_h, all_rockets, grid_np=None, field=None, timer=NULL_TIMER):
+    view = render_view(obs, target, grid, x_offset, clouds, cur_w, cur_h, all_rockets, grid_np, field, timer)
+    get_render_target(x_offset).present(view, screen, (x_offset, 0), cur_w // 2, cur_h)
+    timer.mark('blit')
+
+# --- Split-Screen Scheduler ---
+# With a pool, both viewports render concurrently on worker threads and are
+# composited here on the main thread. Threads only overlap where the GIL is
+# released (NumPy ray kernels, pygame fills and blits), so the gain is largest with
+# RAY_BACKEND = 'numpy'; with the Python backend there is little to win. The
+# workers also call pygame off the main thread, so the pool is opt-in: only raise
+# RENDER_WORKERS for the NumPy backend after benchArena.py --workers 1 2 shows a gain
+# on the station. Each worker times its view with its own StageTimer and the
+# stages are merged into the frame's timer (scaled to the wall time they overlapped
+# in), so the profiler and hitch log keep the per-stage breakdown.
+def render_timed(view_timer, *args):
+    view_timer.start()
+    return render_view(*args, view_timer), view_timer.frame()
+
+def draw_split(screen, pool, p1, p2, grid, clouds, cur_w, cur_h, grid_np=None, field=None, timer=NULL_TIMER):
+    rockets = p1.rockets + p2.rockets
+    if pool is None:
+        draw_arena(screen, p1, p2, grid, 0, clouds, cur_w, cur_h, rockets, grid_np, field, timer)
+        draw_arena(screen, p2, p1, grid, cur_w // 2, clouds, cur_w, cur_h, rockets, grid_np, field, timer)
+        return
+    jobs = [(x, pool.submit(render_timed, StageTimer(), obs, target, grid, x, clouds, cur_w, cur_h, rockets, grid_np, field))
+            for obs, target, x in ((p1, p2, 0), (p2, p1, cur_w // 2))]
+    views, stages = [], {}
+    for x, job in jobs:
+        view, view_stages = job.result()
+        views.append((x, view))
+        for name, t in view_stages.items(): stages[name] = stages.get(name, 0.0) + t
+    timer.merge(stages)
+    for x, view in views: get_render_target(x).present(view, screen, (x, 0), cur_w // 2, cur_h)
+    timer.mark('blit')
+
+def read_map(src):
+    if src.endswith(".arena"): return load_arena(src, writable=True).rows('grid')
+    with open(src, "r") as f: return json.load(f)['grid']
+
+def prepare_map(grid, seed):
+    # Randomize wall colors and clear the two 25x25 spawn zones, then derive the
+    # layers the game needs. Runs only when the compiled map cache misses.
+    if np is not None:
+        grid = np.array(grid, dtype=np.uint8)
+        walls = grid >= 3
+        grid[walls] = np.random.default_rng(seed).choice([3, 4, 5, 6], int(walls.sum()))
+        grid[5:30, 5:30] = 0; grid[170:195, 170:195] = 0
+    else:
+        rng = random.Random(seed)
+        for r in range(len(grid)):
+            for c in range(len(grid[0])):
+                if grid[r][c] >= 3: grid[r][c] = rng.choice([3, 4, 5, 6])
+        for r in range(5, 30):
+            for c in range(5, 30): grid[r][c] = 0
+        for r in range(170, 195):
+            for c in range(170, 195): grid[r][c] = 0
+    return grid, {'dist': distance_field(grid)}
+
+def load_map():
+    # A tiled world directory streams its tiles in around the players. Otherwise the
+    # source is the binary arena unless the JSON map is newer, and what gets mapped
+    # is the compiled (prepared) copy from the cache, read-only and zero-copy.
+    # Returns grid, field, arena (None for tiled worlds).
+    global MAP_SIZE
+    if os.path.isdir(WORLD_DIR):
+        world = TileWorld(WORLD_DIR)
+        MAP_SIZE = max(world.width, world.height)
+        return world, world.field, None
+    src = JSON_FILE
+    if os.path.exists(ARENA_FILE) and (not os.path.exists(JSON_FILE) or os.path.getmtime(ARENA_FILE) >= os.path.getmtime(JSON_FILE)):
+        src = ARENA_FILE
+    arena = compiled_arena(src, MAP_SEED, lambda: prepare_map(read_map(src), MAP_SEED), MAP_PREP_VERSION)
+    MAP_SIZE = arena.width
+    return arena.rows('grid'), arena.rows('dist'), arena
 
 def main():
+    global NUM_RAYS, DRAW_DIST, RENDER_SCALE
     pygame.init(); screen = pygame.display.set_mode((res_w, res_h), pygame.RESIZABLE)
     clock, font, fs = pygame.time.Clock(), pygame.font.SysFont("Arial", 32, bold=True), False
-    sounds = {'whoosh': create_sound(400, 800, 0.15, True), 'hit': create_sound(120, 40, 0.4)}
-    with open("mega_arena.json", "r") as f: grid = json.load(f)['grid']
-    for r in range(len(grid)):
-        for c in range(len(grid[0])):
-            if grid[r][c] >= 3: grid[r][c] = random.choice([3, 4, 5, 6])
-    for r in range(5, 30):
-        for c in range(5, 30): grid[r][c] = 0
-    for r in range(170, 195):
-        for c in range(170, 195): grid[r][c] = 0
-    clouds = [WorldCloud() for _ in range(15)]
+    bank = SoundBank(CACHE_FILE)
+    bank.prewarm(sweeps=[(400, 800, 0.15, True), (120, 40, 0.4)])
+    sounds = PositionalAudio({'whoosh': bank.sweep(400, 800, 0.15, True), 'hit': bank.sweep(120, 40, 0.4)}, VoiceManager())
+    grid, field, arena = load_map()
+    world = grid if isinstance(grid, TileWorld) else None
+    if GRID_STORAGE == 'rle' and arena: grid = RLEGrid.from_rows(grid)
+    grid_np, ray_field = None, field
+    if RAY_BACKEND == 'numpy' and arena and GRID_STORAGE == 'dense': grid_np, ray_field = arena.array('grid'), arena.array('dist')
+    clouds = [WorldCloud() for _ in range(CLOUD_COUNT)]
     p1 = Player("Blue", 15, 15, (0, 120, 255), [pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d], (0, 255, 255), SERIAL_PORT_1)
     p2 = Player("Red", 185, 185, (240, 30, 30), [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT], (255, 0, 255), SERIAL_PORT_2)
+    profiler = FrameProfiler(1000 / FPS); timer = profiler.timer # F3 toggles the overlay
+    pool = ThreadPoolExecutor(RENDER_WORKERS) if RENDER_WORKERS > 1 else None
+    quality = None
+    if ADAPTIVE_QUALITY:
+        # The preset's own values are the ceiling: only levels below them in every component
+        top = (NUM_RAYS, DRAW_DIST, RENDER_SCALE)
+        levels = [l for l in QUALITY_LEVELS if l != top and all(a <= b for a, b in zip(l, top))] + [top]
+        quality = QualityController(levels, len(levels) - 1, 1000 / FPS)
     while True:
+        timer.start()
         cw, ch = screen.get_size()
         for event in pygame.event.get():
             if event.type == pygame.QUIT: sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
                 fs = not fs
                 screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN) if fs else pygame.display.set_mode((res_w, res_h), pygame.RESIZABLE)
-        keys = pygame.key.get_pressed(); [c.update() for c in clouds]
-        p1.update(keys, grid, sounds, p2); p2.update(keys, grid, sounds, p1)
+                background_layers.clear(); view_buffers.clear(); render_targets.clear()
+            if event.type == pygame.VIDEORESIZE: background_layers.clear(); view_buffers.clear(); render_targets.clear()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3: profiler.toggle()
+        keys = pygame.key.get_pressed(); timer.mark('input')
+        if world:
+            for p in (p1, p2): world.request_around(p.x, p.z, DRAW_DIST * RAY_STEP)
+        [c.update() for c in clouds]
+        sounds.set_listeners((p1, p2)) # left view, right view
+        p1.update(keys, grid, sounds, p2, field); p2.update(keys, grid, sounds, p1, field)
+        timer.mark('update')
         screen.fill((0, 0, 0))
-        draw_arena(screen, p1, p2, grid, 0, clouds, cw, ch, p1.rockets + p2.rockets)
-        draw_arena(screen, p2, p1, grid, cw//2, clouds, cw, ch, p1.rockets + p2.rockets)
+        draw_split(screen, pool, p1, p2, grid, clouds, cw, ch, grid_np, ray_field, timer)
         pygame.draw.line(screen, (255, 255, 255), (cw//2, 0), (cw//2, ch), 4)
         score_surf = font.render(f"BLUE: {p1.score}      RED: {p2.score}", True, (255, 255, 255))
         screen.blit(score_surf, (cw//2 - score_surf.get_width()//2, 20))
-        pygame.display.flip(); clock.tick(FPS)
+        timer.mark('hud')
+        profiler.draw(screen, [f"quality {quality.level if quality else '-'}: {NUM_RAYS} rays",
+                               f"  dist {DRAW_DIST}  scale {RENDER_SCALE}"])
+        pygame.display.flip(); timer.mark('flip')
+        work = profiler.end_frame()
+        if quality and quality.update(work): NUM_RAYS, DRAW_DIST, RENDER_SCALE = quality.current()
+        clock.tick(FPS)
 
-if __name__ == "__main__": main()
\ No newline at end of file
+if __name__ == "__main__":
+    configure(sys.modules[__name__]) # quality preset (qualityPresets.py)
+    main()
\ No newline at end of file
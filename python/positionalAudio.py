@@ -0,0 +1,66 @@
+import math
+
+# --- Positional Audio ---
+# Stereo placement of the arena's sounds (rocket launches and impacts on walls or
+# the opponent) for every listener at once, applied with Channel.set_volume.
+# Per listener: gain from GAIN_TABLE by distance, pan from the source's lateral
+# offset (its distance along the listener's right vector over its distance, i.e.
+# the sine of the bearing) through PAN_TABLE. The listener's heading cos/sin are
+# taken once per frame in set_listeners(), so an event costs one sqrt and two
+# table lookups per listener and no trig.
+# Split screen: each listener's pan is folded into its own half of the stereo
+# field (P1's view is the left half of the screen, P2's the right), and the
+# listeners' contributions are summed. A sound nobody can hear takes no voice. The
+# same sound again within the voice manager's coalesce window (e.g. both players
+# firing in one frame) is merged into the channel already playing it: each ear
+# gets the louder of the two placements, so neither player's event is lost.
+HEAR_DIST = 120     # cells; silent beyond this
+REF_DIST = 12       # cells; gain halves at this distance (before the fade-out)
+PAN_STEPS = 64
+MIN_GAIN = 0.02
+
+# distance (whole cells) -> gain: inverse-distance rolloff fading to 0 at HEAR_DIST
+GAIN_TABLE = [REF_DIST / (REF_DIST + d) * (1 - d / HEAR_DIST) for d in range(HEAR_DIST + 1)]
+# stereo position -1 (left) .. 1 (right) in PAN_STEPS steps -> (left, right);
+# equal-power, scaled so the centre plays at full volume in both ears
+PAN_TABLE = [(min(1.0, math.sqrt(2) * math.cos((i / PAN_STEPS) * math.pi / 2)),
+              min(1.0, math.sqrt(2) * math.sin((i / PAN_STEPS) * math.pi / 2))) for i in range(PAN_STEPS + 1)]
+
+class PositionalAudio:
+    def __init__(self, sounds, voices):
+        self.sounds, self.voices = sounds, voices # name -> Sound, voiceManager.VoiceManager
+        self.listeners = [] # (x, z, cos, sin, stereo centre, stereo half-width)
+        self.levels = {} # Channel -> (left, right) it was last set to
+
+    def set_listeners(self, players):
+        # Once per frame, in screen order (left view first)
+        n = len(players)
+        self.listeners = [(p.x, p.z, math.cos(p.angle), math.sin(p.angle), (2 * k + 1) / n - 1, 1 / n)
+                          for k, p in enumerate(players)]
+
+    def volume(self, x, z):
+        left = right = 0.0
+        for lx, lz, cos_a, sin_a, centre, width in self.listeners:
+            dx, dz = x - lx, z - lz
+            d = math.sqrt(dx * dx + dz * dz)
+            if d >= HEAR_DIST: continue
+            pan = (cos_a * dz - sin_a * dx) / d if d > 0.5 else 0.0
+            l, r = PAN_TABLE[int((centre + pan * width + 1) * PAN_STEPS / 2 + 0.5)]
+            gain = GAIN_TABLE[int(d)]
+            left += gain * l; right += gain * r
+        return min(1.0, left), min(1.0, right)
+
+    def play(self, name, x, z, owner=None, kind='ambient'):
+        left, right = self.volume(x, z)
+        if max(left, right) < MIN_GAIN: return None
+        sound = self.sounds[name]
+        ch = self.voices.recent(sound)
+        if ch:
+            l0, r0 = self.levels.get(ch, (0.0, 0.0))
+            left, right = max(left, l0), max(right, r0)
+            self.voices.coalesced += 1
+        else: ch = self.voices.play(sound, kind, owner)
+        if ch:
+            ch.set_volume(left, right)
+            self.levels[ch] = (left, right)
+        return ch
@@ -0,0 +1,126 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import pygame
+
+# --- Quality Presets ---
+# Named sets of the performance constants of both games. configure(module) is
+# called by each game at startup and overwrites the module's constants with the
+# chosen preset; keys a game doesn't have are skipped. The choice lives in
+# PRESET_FILE next to settings.txt. On first launch (no file yet) the station is
+# calibrated: benchArena.py renders each preset headless in a subprocess, from
+# ultra down, and the first one whose p95 frame time fits that preset's frame
+# budget in both games is saved. It is measured at the desktop size (the stations
+# run fullscreen), falling back to CALIBRATE_RES; a calibration whose benchmark
+# failed is used for this launch but not saved, so the next launch retries it.
+# Keys are the games' own constant names; each game only takes the ones it has
+# (the roller's clouds are ROLLER_CLOUD_COUNT, the arena's CLOUD_COUNT).
+#   python qualityPresets.py                 show the saved preset
+#   python qualityPresets.py set medium      pick one by hand
+#   python qualityPresets.py calibrate       re-measure this station
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PRESET_FILE = os.path.join(SCRIPT_DIR, "quality.json")
+PRESET_ORDER = ['low', 'medium', 'high', 'ultra']
+DEFAULT_PRESET = 'high' # the games' own constants
+CALIBRATE_RES = "1920x1080" # if the desktop size can't be read
+CALIBRATE_FRAMES = 90
+
+PRESETS = {
+    'low': {
+        'FPS': 45, 'NUM_RAYS': 120, 'DRAW_DIST': 500, 'RENDER_SCALE': 0.5, 'CLOUD_COUNT': 6,
+        'TREE_COUNT': 12, 'BASE_W': 800, 'WIDE_W': 1400, 'ROLLER_CLOUD_COUNT': 4,
+    },
+    'medium': {
+        'FPS': 60, 'NUM_RAYS': 160, 'DRAW_DIST': 600, 'RENDER_SCALE': 0.75, 'CLOUD_COUNT': 10,
+        'TREE_COUNT': 18, 'BASE_W': 1000, 'WIDE_W': 1600, 'ROLLER_CLOUD_COUNT': 6,
+    },
+    'high': {
+        'FPS': 60, 'NUM_RAYS': 240, 'DRAW_DIST': 1000, 'RENDER_SCALE': 1.0, 'CLOUD_COUNT': 15,
+        'TREE_COUNT': 25, 'BASE_W': 1000, 'WIDE_W': 1800, 'ROLLER_CLOUD_COUNT': 8,
+    },
+    'ultra': {
+        'FPS': 60, 'NUM_RAYS': 480, 'DRAW_DIST': 1000, 'RENDER_SCALE': 1.0, 'CLOUD_COUNT': 20,
+        'TREE_COUNT': 30, 'BASE_W': 1000, 'WIDE_W': 1800, 'ROLLER_CLOUD_COUNT': 10,
+    },
+}
+
+def apply_preset(module, name):
+    for key, value in PRESETS[name].items():
+        if hasattr(module, key): setattr(module, key, value)
+
+def load_preset():
+    try:
+        with open(PRESET_FILE, "r") as f: name = json.load(f).get('preset')
+        if name in PRESETS: return name
+    except (OSError, ValueError): pass
+    return None
+
+def save_preset(name, calibration=None):
+    data = {'preset': name, 'machine': platform.node(), 'time': time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if calibration: data['calibration'] = calibration
+    try:
+        with open(PRESET_FILE, "w") as f: json.dump(data, f, indent=1)
+    except OSError: pass
+
+def station_res():
+    # The size the games run at fullscreen: the (first) desktop
+    try:
+        pygame.display.init()
+        w, h = pygame.display.get_desktop_sizes()[0]
+        if w > 0 and h > 0: return f"{w}x{h}"
+    except (pygame.error, IndexError): pass
+    return CALIBRATE_RES
+
+def measure(name, backend, res):
+    # p95 frame times of one preset from a headless benchArena run
+    fd, out = tempfile.mkstemp(suffix=".jsonl"); os.close(fd)
+    try:
+        subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, "benchArena.py"), "--preset", name, "--backend", backend,
+                        "--res", res, "--frames", str(CALIBRATE_FRAMES), "--json", out],
+                       check=True, capture_output=True, timeout=300)
+        with open(out, "r") as f: records = [json.loads(l) for l in f if l.strip()]
+    finally:
+        os.remove(out)
+    return max(r['stages']['total']['p95'] for r in records)
+
+def calibrate(backend='python'):
+    res = station_res()
+    print(f"Calibrating quality presets for this station at {res}...")
+    results, chosen = {'res': res}, PRESET_ORDER[0]
+    for name in reversed(PRESET_ORDER):
+        budget = 1000 / PRESETS[name]['FPS']
+        try: p95 = measure(name, backend, res)
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError):
+            return DEFAULT_PRESET, {'error': f"benchmark failed at {name}"}
+        results[name] = {'p95_ms': p95, 'budget_ms': round(budget, 2)}
+        print(f"  {name}: p95 {p95:.1f} ms (budget {budget:.1f} ms)")
+        if p95 <= budget:
+            chosen = name
+            break
+    print(f"Using '{chosen}' (saved in {PRESET_FILE})")
+    return chosen, results
+
+def configure(module):
+    # Startup hook for a game module: saved preset, or calibrate on first launch
+    name = load_preset()
+    if name is None:
+        name, results = calibrate(getattr(module, 'RAY_BACKEND', 'python'))
+        if 'error' not in results: save_preset(name, results)
+    apply_preset(module, name)
+    return name
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "set" and sys.argv[2] in PRESETS:
+        save_preset(sys.argv[2]); print(f"Preset set to {sys.argv[2]}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "calibrate":
+        name, results = calibrate(sys.argv[2] if len(sys.argv) > 2 else 'python')
+        if 'error' in results: print(f"Calibration failed ({results['error']}), nothing saved")
+        else: save_preset(name, results)
+    elif len(sys.argv) == 1:
+        print(f"Preset: {load_preset() or 'none (calibrates on next launch)'}")
+    else:
+        print(f"usage: qualityPresets.py [set {'|'.join(PRESET_ORDER)} | calibrate [python|numpy]]")
@@ -0,0 +1,57 @@
+import math
+import pygame
+
+# --- Render Target ---
+# A frame (or one view of it) is drawn at an internal resolution and then brought
+# to its on-screen size by one of UPSCALE_FILTERS:
+#   nearest  base size * scale, pygame.transform.scale up (blocky, cheapest)
+#   smooth   base size * scale, pygame.transform.smoothscale up (soft)
+#   integer  output size / k with k = round(1/scale), every pixel upscaled to an
+#            exact k x k block (crisp), cropped to the output
+#   direct   drawn at output size, no scaling pass at all (scale is ignored)
+# "base" is the size the game's coordinates are laid out for (the roller's
+# virtual surface, or just the output size). The canvas and the scaled destination
+# are kept between frames and only reallocated when their size changes, so
+# steady-state frames allocate nothing.
+UPSCALE_FILTERS = ('nearest', 'smooth', 'integer', 'direct')
+
+class RenderTarget:
+    def __init__(self, upscale='smooth'):
+        if upscale not in UPSCALE_FILTERS: raise ValueError(f"upscale must be one of {UPSCALE_FILTERS}")
+        self.upscale = upscale
+        self.canvas, self.scaled = None, None
+
+    def internal_size(self, out_w, out_h, scale, base=None):
+        base_w, base_h = base or (out_w, out_h)
+        if self.upscale == 'direct': return out_w, out_h
+        if self.upscale == 'integer':
+            k = max(1, round(1 / scale))
+            return max(1, math.ceil(out_w / k)), max(1, math.ceil(out_h / k))
+        return max(1, int(base_w * scale)), max(1, int(base_h * scale))
+
+    def get_canvas(self, w, h):
+        # One reusable internal frame buffer of the current size
+        if self.canvas is None or self.canvas.get_size() != (w, h):
+            self.canvas = pygame.Surface((w, h)).convert()
+        return self.canvas
+
+    def dest(self, size, like):
+        if self.scaled is None or self.scaled.get_size() != size:
+            self.scaled = pygame.Surface(size, 0, like)
+        return self.scaled
+
+    def present(self, src, screen, pos, out_w, out_h):
+        w, h = src.get_size()
+        if (w, h) == (out_w, out_h): screen.blit(src, pos); return
+        if self.upscale == 'integer':
+            k = math.ceil(max(out_w / w, out_h / h))
+            scaled = pygame.transform.scale(src, (w * k, h * k), self.dest((w * k, h * k), src))
+            screen.blit(scaled, pos, (0, 0, out_w, out_h)); return
+        if self.upscale == 'smooth' and src.get_bitsize() >= 24:
+            scaled = pygame.transform.smoothscale(src, (out_w, out_h), self.dest((out_w, out_h), src))
+        else:
+            scaled = pygame.transform.scale(src, (out_w, out_h), self.dest((out_w, out_h), src))
+        screen.blit(scaled, pos)
+
+    def clear(self):
+        self.canvas, self.scaled = None, None
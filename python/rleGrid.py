@@ -0,0 +1,210 @@
+import array
+import math
+from bisect import bisect_right
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Run-Length Grid ---
+# Huge open worlds are mostly floor, so each row (and each column) is stored as its
+# runs: sorted run starts plus one value per run. A 50000-cell row of open floor is
+# a single run, and identical rows share one RLERow object. grid[x][z] works like the
+# list-of-lists grid (a bisect per lookup), and next_wall() answers "first wall
+# after z along this row" in a run or two, which cast_ray below uses to skip whole
+# stretches of a row or column at once. Callers bounds-check like with any grid.
+WALL = 3
+
+class RLERow:
+    __slots__ = ('starts', 'vals', 'length')
+    def __init__(self, starts, vals, length):
+        self.starts, self.vals, self.length = starts, vals, length
+
+    def __getitem__(self, z):
+        return self.vals[bisect_right(self.starts, z) - 1]
+
+    def __len__(self):
+        return self.length
+
+    def next_wall(self, z, step):
+        # First wall index strictly after z in direction step (+1/-1); the row's
+        # ends count as walls, so this returns length or -1 when there is none.
+        starts, vals = self.starts, self.vals
+        i = bisect_right(starts, z) - 1
+        if step > 0:
+            for j in range(i + 1, len(starts)):
+                if vals[j] >= WALL: return starts[j]
+            return self.length
+        for j in range(i - 1, -1, -1):
+            if vals[j] >= WALL: return starts[j + 1] - 1
+        return -1
+
+def _runs(row):
+    if np is not None:
+        row = np.asarray(row, dtype=np.uint8)
+        starts = np.concatenate(([0], np.flatnonzero(row[1:] != row[:-1]) + 1))
+        return array.array('I', starts.tolist()), bytes(row[starts])
+    starts, vals = array.array('I'), bytearray()
+    for z, v in enumerate(row):
+        if not vals or v != vals[-1]: starts.append(z); vals.append(v)
+    return starts, bytes(vals)
+
+class RLEGrid:
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.width, self.height = len(rows), len(cols)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: any iterable of equal-length rows (lists, memoryviews, NumPy rows),
+        # consumed one at a time so the dense grid never has to exist all at once.
+        out, shared = [], {}
+        col_starts, col_vals, prev = None, None, None
+        for x, row in enumerate(rows):
+            starts, vals = _runs(row)
+            key = (starts.tobytes(), vals)
+            if key not in shared: shared[key] = RLERow(starts, vals, len(row))
+            out.append(shared[key])
+            # Column runs: only columns whose value changed from the previous row
+            # start a new run.
+            if prev is None:
+                col_starts = [[0] for _ in range(len(row))]
+                col_vals = [bytearray([v]) for v in (row if np is None else np.asarray(row, dtype=np.uint8).tolist())]
+                changed = ()
+            elif np is not None:
+                cur = np.asarray(row, dtype=np.uint8)
+                changed = np.flatnonzero(cur != prev).tolist()
+            else:
+                changed = [z for z in range(len(row)) if row[z] != prev[z]]
+            for z in changed:
+                col_starts[z].append(x); col_vals[z].append(row[z])
+            prev = np.array(row, dtype=np.uint8) if np is not None else list(row)
+        width, shared_cols = len(out), {}
+        cols = []
+        for starts, vals in zip(col_starts or [], col_vals or []):
+            key = (tuple(starts), bytes(vals))
+            if key not in shared_cols: shared_cols[key] = RLERow(array.array('I', starts), bytes(vals), width)
+            cols.append(shared_cols[key])
+        return cls(out, cols)
+
+    def __getitem__(self, x):
+        return self.rows[x]
+
+    def __len__(self):
+        return self.width
+
+    def get(self, x, z):
+        return self.rows[x][z]
+
+    def next_wall_in_row(self, x, z, step):
+        return self.rows[x].next_wall(z, step)
+
+    def next_wall_in_col(self, x, z, step):
+        return self.cols[z].next_wall(x, step)
+
+    def nbytes(self):
+        seen, total = set(), 0
+        for r in self.rows + self.cols:
+            if id(r) not in seen:
+                seen.add(id(r)); total += r.starts.itemsize * len(r.starts) + len(r.vals)
+        return total
+
+# --- Run-Skipping DDA ---
+# Same contract as mapView110.cast_ray (t, val, side, offset or None; outside the
+# map is wall 3; field is accepted but not needed). While the ray is inside one row (or column, for rays that run
+# mostly along x) and next_wall() says that row has no wall before the ray leaves
+# it, the DDA jumps straight to the exit cell instead of stepping through the run.
+def cast_ray(rle, ox, oz, cos_a, sin_a, max_t, field=None):
+    size_x, size_z = rle.width, rle.height
+    cx, cz = int(ox), int(oz)
+    inf = float('inf')
+    if cos_a > 0: step_x, delta_x = 1, 1 / cos_a; side_x = (cx + 1 - ox) * delta_x
+    elif cos_a < 0: step_x, delta_x = -1, -1 / cos_a; side_x = (ox - cx) * delta_x
+    else: step_x, delta_x, side_x = 0, inf, inf
+    if sin_a > 0: step_z, delta_z = 1, 1 / sin_a; side_z = (cz + 1 - oz) * delta_z
+    elif sin_a < 0: step_z, delta_z = -1, -1 / sin_a; side_z = (oz - cz) * delta_z
+    else: step_z, delta_z, side_z = 0, inf, inf
+    along_rows = abs(sin_a) >= abs(cos_a)
+    rows, cols = rle.rows, rle.cols
+    line, wall = None, None # row (or column) last queried, and its next wall ahead of the ray
+    while True:
+        if (cx if along_rows else cz) != line and 0 <= cx < size_x and 0 <= cz < size_z:
+            if along_rows:
+                line, wall = cx, rows[cx].next_wall(cz, step_z)
+                if side_z < side_x:
+                    z_end = int(math.floor(oz + min(side_x, max_t) * sin_a))
+                    if (wall - z_end) * step_z > 0 and z_end != cz:
+                        cz = z_end
+                        side_z = ((cz + 1 if step_z > 0 else cz) - oz) * delta_z * step_z
+            else:
+                line, wall = cz, cols[cz].next_wall(cx, step_x)
+                if side_x < side_z:
+                    x_end = int(math.floor(ox + min(side_z, max_t) * cos_a))
+                    if (wall - x_end) * step_x > 0 and x_end != cx:
+                        cx = x_end
+                        side_x = ((cx + 1 if step_x > 0 else cx) - ox) * delta_x * step_x
+        if side_x < side_z:
+            t, side = side_x, 0
+            side_x += delta_x; cx += step_x
+        else:
+            t, side = side_z, 1
+            side_z += delta_z; cz += step_z
+        if t > max_t: return None
+        # Still in the queried row/column and short of its next wall: known floor
+        if along_rows:
+            if side == 1 and cx == line and (wall - cz) * step_z > 0: continue
+        elif side == 0 and cz == line and (wall - cx) * step_x > 0: continue
+        if 0 <= cx < size_x and 0 <= cz < size_z:
+            row = rows[cx]
+            val = row.vals[bisect_right(row.starts, cz) - 1]
+        else: val = 3
+        if val >= 3:
+            offset = (oz + t * sin_a) % 1 if side == 0 else (ox + t * cos_a) % 1
+            return t, val, side, offset
+
+def benchmark(size=1024, seed=1, lookups=200000, rays=2000):
+    # Memory and throughput of the RLE grid against the dense list-of-lists grid
+    # on a mapGen24 arena. Both grids' memory is what tracemalloc sees allocated
+    # while building them (rle_payload_bytes is just the run arrays' contents).
+    import random, time, tracemalloc
+    from mapGen24 import generate
+    import mapView110
+    dense_np = generate(size, seed)
+    def traced(build):
+        tracemalloc.start()
+        grid = build()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return grid, used
+    dense, dense_bytes = traced(dense_np.tolist)
+    rle, rle_bytes = traced(lambda: RLEGrid.from_rows(dense_np))
+    start = time.perf_counter(); RLEGrid.from_rows(dense_np); build_t = time.perf_counter() - start
+    rng = random.Random(seed)
+    pts = [(rng.randrange(size), rng.randrange(size)) for _ in range(lookups)]
+    results = {'size': size, 'dense_bytes': dense_bytes, 'rle_bytes': rle_bytes, 'rle_payload_bytes': rle.nbytes(),
+               'rle_build_s': round(build_t, 3)}
+    for name, g in (('dense', dense), ('rle', rle)):
+        start = time.perf_counter()
+        for x, z in pts: g[x][z]
+        results[f'{name}_get_ns'] = round((time.perf_counter() - start) / lookups * 1e9)
+    start = time.perf_counter()
+    for x, z in pts[:lookups // 4]: rle.next_wall_in_row(x, z, 1); rle.next_wall_in_col(x, z, -1)
+    results['rle_next_wall_ns'] = round((time.perf_counter() - start) / (lookups // 2) * 1e9)
+    mapView110.MAP_SIZE = size
+    casts = []
+    for _ in range(rays):
+        while True:
+            ox, oz = rng.uniform(1, size - 1), rng.uniform(1, size - 1)
+            if dense[int(ox)][int(oz)] < WALL: break
+        a = rng.uniform(0, 2 * math.pi)
+        casts.append((ox, oz, math.cos(a), math.sin(a)))
+    for name, cast in (('dense', lambda c: mapView110.cast_ray(dense, *c, 200)), ('rle', lambda c: cast_ray(rle, *c, 200))):
+        start = time.perf_counter()
+        for c in casts: cast(c)
+        results[f'{name}_ray_us'] = round((time.perf_counter() - start) / rays * 1e6, 1)
+    return results
+
+if __name__ == "__main__":
+    import json, sys
+    # python rleGrid.py [size]  -> one JSON line of results
+    print(json.dumps(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)))
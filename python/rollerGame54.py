@@ -4,7 +4,12 @@ import threading
 import random
 import time
 import os
-import array
+import sys
+from frameTimer import NULL_TIMER, FrameProfiler
+from renderTarget import RenderTarget
+from qualityPresets import configure
+from soundBank import SoundBank, CACHE_FILE
+from voiceManager import VoiceManager
 
 # --- CONFIG ---
 SERIAL_PORT_1 = 'COM4'
@@ -12,24 +17,13 @@ SERIAL_PORT_2 = 'COM5'
 BAUD_RATE = 9600
 BASE_W, BASE_H = 1000, 600
 WIDE_W = 1800  
+FPS = 60
+TREE_COUNT, ROLLER_CLOUD_COUNT = 25, 8
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SETTINGS_FILE = os.path.join(SCRIPT_DIR, "settings.txt")
-
-# --- SOUND GENERATOR ---
-def generate_beep(frequency, duration=0.1, volume=0.1):
-    sample_rate = 44100
-    n_samples = int(sample_rate * duration)
-    buf = array.array('h', [0] * n_samples)
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        fade = (n_samples - i) / n_samples
-        buf[i] = int(volume * 32767 * fade * (0.5 * (1.0 if (i % (sample_rate//frequency) < sample_rate//(2*frequency)) else -1.0)))
-    return pygame.mixer.Sound(buf)
-
-def play_chord(freqs, vol=0.1):
-    for f in freqs:
-        generate_beep(f, duration=0.4, volume=vol).play()
+RENDER_SCALE = 1.0 # the race renders at this fraction of the virtual size (BASE_W/WIDE_W x BASE_H)
+UPSCALE_FILTER = 'smooth' # 'nearest', 'smooth', 'integer' or 'direct' (renderTarget.py)
 
 # --- DRAWING FUNCTIONS ---
 def draw_bicycle(surface, x, y, size, color, speed, is_moving):
@@ -84,21 +78,28 @@ class RollerGame:
         pygame.init()
         pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
         self.screen = pygame.display.set_mode((BASE_W, BASE_H), pygame.RESIZABLE)
-        self.virtual_surface = pygame.Surface((BASE_W, BASE_H))
+        self.virtual_w = BASE_W # logical frame width the race is laid out in
+        self.render = RenderTarget(UPSCALE_FILTER)
         self.is_fullscreen = False
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("Impact", 22)
+        self.fonts = {22: self.font}
         self.state = "MENU"
         self.num_humans = 1
         
         # P1 (Left View) | P2 (Right View)
         self.p1 = Rider((0, 255, 100), "P1", bell_pitch=1000, chord_freqs=[523, 659, 783])
         self.p2 = Rider((0, 150, 255), "P2", bell_pitch=800, chord_freqs=[392, 493, 587])
+        # Every bell and pre-mixed chord is synthesized here, never mid-race
+        self.sounds = SoundBank(CACHE_FILE)
+        self.sounds.prewarm(beeps=[p.bell_pitch for p in (self.p1, self.p2)], chords=[p.chord_freqs for p in (self.p1, self.p2)])
+        self.voices = VoiceManager()
         
         self.sensitivity, self.obs_quantity, self.npc_quantity = load_settings()
         self.update_ui_rects()
         self.dragging_sens = self.dragging_obs = self.dragging_npc = False
         self.npcs, self.obstacles, self.trees, self.clouds = [], [], [], []
+        self.timer = NULL_TIMER # frameTimer.StageTimer to split frames into stages
 
     def update_ui_rects(self):
         vw = WIDE_W if self.num_humans == 2 else BASE_W
@@ -106,10 +107,10 @@ class RollerGame:
         self.obs_rect = pygame.Rect(vw - 220, 75, 180, 8)
         self.npc_rect = pygame.Rect(vw - 220, 125, 180, 8)
 
-    def setup_race(self):
-        random.seed(time.time())
+    def setup_race(self, seed=None):
+        random.seed(time.time() if seed is None else seed)
         current_w = WIDE_W if self.num_humans == 2 else BASE_W
-        self.virtual_surface = pygame.Surface((current_w, BASE_H))
+        self.virtual_w = current_w
         self.update_ui_rects()
         self.p1.z = 0; self.p1.score = 0; self.p1.scored_ids.clear()
         self.p2.z = 0; self.p2.score = 0; self.p2.scored_ids.clear()
@@ -119,8 +120,8 @@ class RollerGame:
             n.id = f"n{i}"; n.lane_idx = random.randint(0,4); n.speed = random.uniform(4, 16); n.z = random.randint(1000, 6000)
             self.npcs.append(n)
         self.obstacles = [{'id':f'o{i}', 'lane':random.randint(0,4), 'z':random.randint(2000,10000), 'color':(random.randint(50,255),random.randint(50,255),random.randint(50,255))} for i in range(int(self.obs_quantity))]
-        self.trees = [{'x': random.choice([-1, 1]) * random.randint(850, 1600), 'z': i*450} for i in range(25)]
-        self.clouds = [[random.randint(0, current_w), random.randint(20, 250), random.uniform(0.1, 0.4), random.randint(70, 120)] for _ in range(8)]
+        self.trees = [{'x': random.choice([-1, 1]) * random.randint(850, 1600), 'z': i*450} for i in range(TREE_COUNT)]
+        self.clouds = [[random.randint(0, current_w), random.randint(20, 250), random.uniform(0.1, 0.4), random.randint(70, 120)] for _ in range(ROLLER_CLOUD_COUNT)]
 
     def serial_thread(self, port, player):
         try:
@@ -131,7 +132,7 @@ class RollerGame:
         except: pass
 
     def update_game(self, now):
-        cur_w = self.virtual_surface.get_width()
+        cur_w = self.virtual_w
         for c in self.clouds:
             c[0] += c[2]
             if c[0] > cur_w + 100: c[0] = -100
@@ -151,14 +152,14 @@ class RollerGame:
                     elif p.z > n.z and n.id not in p.scored_ids:
                         p.score += 500
                         p.scored_ids.add(n.id)
-                        generate_beep(p.bell_pitch).play()
+                        self.voices.play(self.sounds.beep(p.bell_pitch), 'bell', p.name)
                 
                 if self.num_humans == 2:
                     other = self.p2 if p == self.p1 else self.p1
                     if p.z > other.z and other.name not in p.scored_ids:
                         p.score += 1000
                         p.scored_ids.add(other.name)
-                        play_chord(p.chord_freqs)
+                        self.voices.play(self.sounds.chord(p.chord_freqs), 'chord', p.name)
                     if p.z < other.z and other.name in p.scored_ids:
                         p.scored_ids.remove(other.name)
 
@@ -176,15 +177,21 @@ class RollerGame:
         for o in self.obstacles:
             if lead_z - o['z'] > 500: o['z'] = lead_z + random.randint(5000, 10000)
         for t in self.trees:
-            if lead_z - t['z'] > 1000: t['z'] += 11000
+            if lead_z - t['z'] > 1000: t['z'] += TREE_COUNT * 440
 
-    def draw_view(self, target_player):
-        view_w = self.virtual_surface.get_width()
-        view = pygame.Surface((view_w, BASE_H))
+    def draw_view(self, target_player, view=None, x0=0, sx=1.0, sy=1.0):
+        # The race as target_player sees it, laid out in the logical virtual_w x BASE_H
+        # frame and drawn into `view` with x -> (x - x0) * sx, y -> y * sy, so a split
+        # screen slice or a scaled canvas is drawn directly at its own size. Without a
+        # view it returns a new full-size logical frame.
+        view_w = self.virtual_w
+        if view is None: view = pygame.Surface((view_w, BASE_H))
+        X = lambda x: (x - x0) * sx
         view.fill((135, 206, 235)) 
-        for c in self.clouds: pygame.draw.circle(view, (255, 255, 255), (int(c[0]), int(c[1])), c[3])
-        pygame.draw.rect(view, (34, 139, 34), (0, 300, view_w, 300))
-        pygame.draw.polygon(view, (40, 40, 40), [(view_w//2-10, 300), (view_w//2+10, 300), (view_w-20, 600), (20, 600)])
+        for c in self.clouds: pygame.draw.circle(view, (255, 255, 255), (int(X(c[0])), int(c[1] * sy)), int(c[3] * sy))
+        pygame.draw.rect(view, (34, 139, 34), (0, int(300 * sy), view.get_width(), view.get_height() - int(300 * sy)))
+        pygame.draw.polygon(view, (40, 40, 40), [(X(view_w//2-10), 300 * sy), (X(view_w//2+10), 300 * sy), (X(view_w-20), 600 * sy), (X(20), 600 * sy)])
+        self.timer.mark('sky')
         
         active_riders = [self.p1] if self.num_humans == 1 else [self.p1, self.p2]
         all_objs = sorted(self.trees + self.npcs + self.obstacles + active_riders, 
@@ -199,48 +206,82 @@ class RollerGame:
                 if 'lane' in obj: 
                     x_screen = view_w//2 + ((obj['lane'] - 2) * 200 * scale)
                     w = 170 * scale
-                    pygame.draw.rect(view, obj['color'], (int(x_screen-w/2), int(300+(300*scale)-35*scale), int(w), int(70*scale)))
+                    pygame.draw.rect(view, obj['color'], (int(X(x_screen-w/2)), int((300+(300*scale)-35*scale) * sy), int(w * sx), int(70*scale * sy)))
                 else: 
-                    draw_tree(view, view_w//2 + (obj['x']*scale), 300 + (300*scale), 220*scale)
+                    draw_tree(view, X(view_w//2 + (obj['x']*scale)), (300 + (300*scale)) * sy, 220*scale * sy)
             else: 
                 x_screen = view_w//2 + ((obj.lane_idx - 2) * 200 * scale)
-                draw_bicycle(view, int(x_screen), int(300 + (300 * scale)), 130*scale, obj.color, obj.speed, obj.speed > 0.5)
+                draw_bicycle(view, int(X(x_screen)), int((300 + (300 * scale)) * sy), 130*scale * sy, obj.color, obj.speed, obj.speed > 0.5)
+        self.timer.mark('sprites')
         return view
 
-    def draw_game(self):
-        cur_w = self.virtual_surface.get_width()
+    def draw_game(self, canvas):
+        # canvas: the render target's frame buffer, any size; the logical frame is
+        # mapped onto it (each split-screen view straight into its half).
+        cur_w = self.virtual_w
+        cw, ch = canvas.get_size()
+        sx, sy = cw / cur_w, ch / BASE_H
         if self.num_humans == 1:
-            self.virtual_surface.blit(self.draw_view(self.p1), (0, 0))
+            self.draw_view(self.p1, canvas, 0, sx, sy)
         else:
-            v1 = self.draw_view(self.p1)
-            v2 = self.draw_view(self.p2)
             slice_w = cur_w // 2
-            self.virtual_surface.blit(v1, (0, 0), (cur_w//2 - slice_w//2, 0, slice_w, BASE_H))
-            self.virtual_surface.blit(v2, (cur_w//2, 0), (cur_w//2 - slice_w//2, 0, slice_w, BASE_H))
-            pygame.draw.line(self.virtual_surface, (0, 0, 0), (cur_w//2, 0), (cur_w//2, BASE_H), 5)
+            split = int(cur_w // 2 * sx)
+            self.draw_view(self.p1, canvas.subsurface((0, 0, split, ch)), cur_w//2 - slice_w//2, sx, sy)
+            self.draw_view(self.p2, canvas.subsurface((split, 0, cw - split, ch)), cur_w//2 - slice_w//2, sx, sy)
+            pygame.draw.line(canvas, (0, 0, 0), (split, 0), (split, ch), max(1, int(5 * sx)))
 
-        self.draw_slider(self.virtual_surface, self.sens_rect, self.sensitivity, 20, 150, "SENS")
-        self.draw_slider(self.virtual_surface, self.obs_rect, self.obs_quantity, 0, 10, "BLOCKS")
-        self.draw_slider(self.virtual_surface, self.npc_rect, self.npc_quantity, 0, 11, "RANDOMS")
+        self.draw_slider(canvas, self.sens_rect, self.sensitivity, 20, 150, "SENS", sx, sy)
+        self.draw_slider(canvas, self.obs_rect, self.obs_quantity, 0, 10, "BLOCKS", sx, sy)
+        self.draw_slider(canvas, self.npc_rect, self.npc_quantity, 0, 11, "RANDOMS", sx, sy)
         
-        self.virtual_surface.blit(self.font.render(f"P1: {self.p1.score}", True, (0, 80, 0)), (25, 25))
+        font = self.get_font(sy)
+        canvas.blit(font.render(f"P1: {self.p1.score}", True, (0, 80, 0)), (int(25 * sx), int(25 * sy)))
         if self.num_humans == 2: 
-            self.virtual_surface.blit(self.font.render(f"P2: {self.p2.score}", True, (0, 0, 80)), (cur_w//2 + 25, 25))
+            canvas.blit(font.render(f"P2: {self.p2.score}", True, (0, 0, 80)), (int((cur_w//2 + 25) * sx), int(25 * sy)))
+        self.timer.mark('hud')
+
+    def draw_menu(self, canvas):
+        vw, (cw, ch) = self.virtual_w, canvas.get_size()
+        sx, sy = cw / vw, ch / BASE_H
+        font = self.get_font(sy)
+        canvas.fill((30, 30, 60))
+        canvas.blit(font.render(f"PLAYERS: {self.num_humans} (Press 1 or 2)", True, (200,200,200)), (int((vw//2 - 100) * sx), int(250 * sy)))
+        canvas.blit(font.render("PRESS ENTER TO RACE | F for Fullscreen", True, (50,255,50)), (int((vw//2 - 150) * sx), int(300 * sy)))
+        self.timer.mark('hud')
 
-    def draw_slider(self, surf, rect, val, v_min, v_max, label):
+    def draw_frame(self):
+        # Whole frame into the render target's canvas (RENDER_SCALE of the logical
+        # frame, or window size for 'direct'), then upscaled onto the window
+        sw, sh = self.screen.get_size()
+        canvas = self.render.get_canvas(*self.render.internal_size(sw, sh, RENDER_SCALE, (self.virtual_w, BASE_H)))
+        if self.state == "PLAYING": self.draw_game(canvas)
+        else: self.draw_menu(canvas)
+        self.render.present(canvas, self.screen, (0, 0), sw, sh)
+        self.timer.mark('scale')
+
+    def get_font(self, sy):
+        # HUD font sized for a canvas sy times the logical height
+        size = max(8, round(22 * sy))
+        if size not in self.fonts: self.fonts[size] = pygame.font.SysFont("Impact", size)
+        return self.fonts[size]
+
+    def draw_slider(self, surf, rect, val, v_min, v_max, label, sx=1.0, sy=1.0):
+        rect = pygame.Rect(int(rect.x * sx), int(rect.y * sy), max(1, int(rect.w * sx)), max(1, int(rect.h * sy)))
         hx = rect.left + ((val - v_min) / (v_max - v_min)) * rect.width
         pygame.draw.rect(surf, (70, 70, 70), rect)
-        pygame.draw.rect(surf, (220, 220, 220), (int(hx-6), rect.top-6, 12, 20))
-        txt = self.font.render(f"{label}: {int(val)}", True, (0,0,0))
-        surf.blit(txt, (rect.left, rect.bottom + 2))
+        pygame.draw.rect(surf, (220, 220, 220), (int(hx-6 * sx), rect.top-int(6 * sy), int(12 * sx), int(20 * sy)))
+        txt = self.get_font(sy).render(f"{label}: {int(val)}", True, (0,0,0))
+        surf.blit(txt, (rect.left, rect.bottom + int(2 * sy)))
 
     def run(self):
         threading.Thread(target=self.serial_thread, args=(SERIAL_PORT_1, self.p1), daemon=True).start()
         threading.Thread(target=self.serial_thread, args=(SERIAL_PORT_2, self.p2), daemon=True).start()
+        profiler = FrameProfiler(1000 / FPS); self.timer = profiler.timer # F3 toggles the overlay
         while True:
+            self.timer.start()
             now = time.time()
             sw, sh = self.screen.get_size()
-            vw = self.virtual_surface.get_width()
+            vw = self.virtual_w
             raw_mx, raw_my = pygame.mouse.get_pos()
             mx, my = raw_mx * (vw / sw), raw_my * (BASE_H / sh)
             
@@ -249,6 +290,7 @@ class RollerGame:
                     save_settings(self.sensitivity, self.obs_quantity, self.npc_quantity)
                     return
                 if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3: profiler.toggle()
                     if event.key == pygame.K_f:
                         self.is_fullscreen = not self.is_fullscreen
                         if self.is_fullscreen: self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
@@ -295,16 +337,15 @@ class RollerGame:
                     # KEY CHANGE: W = P1 speed, Up Arrow = P2 speed
                     if keys[pygame.K_w]: self.p1.pulses += 4
                     if keys[pygame.K_UP]: self.p2.pulses += 4
+                self.timer.mark('input')
                 
-                self.update_game(now); self.draw_game()
-            else: 
-                self.virtual_surface.fill((30, 30, 60))
-                self.virtual_surface.blit(self.font.render(f"PLAYERS: {self.num_humans} (Press 1 or 2)", True, (200,200,200)), (vw//2 - 100, 250))
-                self.virtual_surface.blit(self.font.render("PRESS ENTER TO RACE | F for Fullscreen", True, (50,255,50)), (vw//2 - 150, 300))
+                self.update_game(now); self.timer.mark('update')
+            else: self.timer.mark('input')
 
-            scaled_surf = pygame.transform.smoothscale(self.virtual_surface, (sw, sh))
-            self.screen.blit(scaled_surf, (0, 0))
-            pygame.display.flip(); self.clock.tick(60)
+            self.draw_frame(); profiler.draw(self.screen)
+            pygame.display.flip(); self.timer.mark('flip')
+            profiler.end_frame(); self.clock.tick(FPS)
 
 if __name__ == "__main__":
+    configure(sys.modules[__name__]) # quality preset (qualityPresets.py)
     RollerGame().run()
\ No newline at end of file
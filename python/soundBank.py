@@ -0,0 +1,149 @@
+import array
+import json
+import math
+import os
+import random
+import sys
+import pygame
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Sound Bank ---
+# Every game sound is synthesized once, with array math, and handed out as a cached
+# pygame Sound keyed by its synth parameters. Games prewarm() the sounds they can
+# play at startup, so nothing is synthesized on the frame path; `misses` counts
+# the sounds that were built after that (should stay 0).
+# The sample math is the old per-sample loops' (rollerGame54.generate_beep,
+# mapView110.create_sound), expression for expression, so beeps come out
+# sample-for-sample identical. Without NumPy the same loops run, still only once.
+# With a cache_path the rendered PCM is also kept on disk (CACHE_FILE, next to
+# settings.txt), so later launches only read it back: one bundle of raw int16
+# buffers behind a JSON index line, handed to pygame as-is. The index records the
+# sample rate, mixer format and byte order; if any differ the bundle is rebuilt.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(SCRIPT_DIR, "sounds.pcm")
+CACHE_MAGIC = b"SNDBANK1\n"
+SAMPLE_RATE = 44100
+CHORD_PEAK = 0.9 * 32767 # pre-mixed chords are scaled down only if they'd peak above this
+
+def beep_samples(frequency, duration=0.1, volume=0.1):
+    # Fading square wave at half amplitude
+    n_samples = int(SAMPLE_RATE * duration)
+    period, high = SAMPLE_RATE // frequency, SAMPLE_RATE // (2 * frequency)
+    if np is not None:
+        i = np.arange(n_samples)
+        fade = (n_samples - i) / n_samples
+        square = np.where(i % period < high, 0.5, -0.5)
+        return (volume * 32767 * fade * square).astype(np.int16)
+    buf = array.array('h', [0] * n_samples)
+    for i in range(n_samples):
+        fade = (n_samples - i) / n_samples
+        buf[i] = int(volume * 32767 * fade * (0.5 * (1.0 if (i % period < high) else -1.0)))
+    return buf
+
+def chord_samples(freqs, duration=0.4, volume=0.1):
+    # The notes summed into one buffer, as the mixer would sum three voices; scaled
+    # down to CHORD_PEAK if the sum would clip (the riders' chords never do)
+    notes = [beep_samples(f, duration, volume) for f in freqs]
+    if np is not None:
+        mix = np.sum([n.astype(np.int32) for n in notes], axis=0)
+        peak = int(np.abs(mix).max())
+        if peak > CHORD_PEAK: mix = mix * (CHORD_PEAK / peak)
+        return mix.astype(np.int16)
+    mix = [sum(samples) for samples in zip(*notes)]
+    peak = max(abs(v) for v in mix)
+    gain = CHORD_PEAK / peak if peak > CHORD_PEAK else 1
+    return array.array('h', [int(v * gain) for v in mix])
+
+def sweep_samples(freq_start, freq_end, duration, noise=False, seed=None):
+    # Fading sine glide from freq_start to freq_end, or fading white noise
+    n_samples = int(SAMPLE_RATE * duration)
+    if np is not None:
+        i = np.arange(n_samples)
+        frac = i / n_samples
+        if noise: val = np.random.default_rng(seed).uniform(-1, 1, n_samples)
+        else: val = np.sin(2 * math.pi * (freq_start + (freq_end - freq_start) * frac) * (i / SAMPLE_RATE))
+        return (val * 32767 * 0.3 * (1.0 - frac)).astype(np.int16)
+    rng = random.Random(seed)
+    buf = array.array('h', [0] * n_samples)
+    for i in range(n_samples):
+        t = float(i) / SAMPLE_RATE
+        frac = i / n_samples
+        freq = freq_start + (freq_end - freq_start) * frac
+        val = rng.uniform(-1, 1) if noise else math.sin(2 * math.pi * freq * t)
+        buf[i] = int(val * 32767 * 0.3 * (1.0 - frac))
+    return buf
+
+def cache_format():
+    return {'rate': SAMPLE_RATE, 'mixer': list(pygame.mixer.get_init() or ()), 'byteorder': sys.byteorder}
+
+def load_cache(path):
+    # {key string: PCM bytes} from a bundle written for this mixer, else {}
+    try:
+        with open(path, "rb") as f: data = f.read()
+        if not data.startswith(CACHE_MAGIC): return {}
+        end = data.index(b"\n", len(CACHE_MAGIC))
+        index = json.loads(data[len(CACHE_MAGIC):end])
+        if index.get('format') != cache_format(): return {}
+        body = memoryview(data)[end + 1:]
+        return {key: body[offset:offset + size] for key, offset, size in index['sounds']}
+    except (OSError, ValueError, KeyError, TypeError): return {}
+
+def save_cache(path, pcm):
+    entries, offset = [], 0
+    for key, buf in pcm.items():
+        entries.append([key, offset, len(buf)]); offset += len(buf)
+    index = json.dumps({'format': cache_format(), 'sounds': entries}).encode()
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(CACHE_MAGIC + index + b"\n")
+            for buf in pcm.values(): f.write(buf)
+        os.replace(tmp, path)
+    except OSError: pass
+
+class SoundBank:
+    def __init__(self, cache_path=None):
+        self.sounds = {} # (kind, params...) -> pygame Sound
+        self.warm, self.misses = False, 0
+        self.cache_path = cache_path
+        # repr(key + (rate,)) -> raw samples; both games share one bundle, so entries
+        # this game doesn't use are kept and written back too
+        self.pcm = load_cache(cache_path) if cache_path else {}
+        self.dirty = False
+
+    def get(self, key, synth):
+        sound = self.sounds.get(key)
+        if sound is None:
+            if self.warm: self.misses += 1
+            name = repr(key + (SAMPLE_RATE,))
+            buf = self.pcm.get(name)
+            if buf is None:
+                buf = self.pcm[name] = synth().tobytes()
+                self.dirty = True
+            sound = self.sounds[key] = pygame.mixer.Sound(buffer=buf)
+        return sound
+
+    def beep(self, frequency, duration=0.1, volume=0.1):
+        return self.get(('beep', frequency, duration, volume), lambda: beep_samples(frequency, duration, volume))
+
+    def chord(self, freqs, vol=0.1):
+        # 0.4 s notes like the old play_chord, pre-mixed into one Sound (one voice)
+        freqs = tuple(freqs)
+        return self.get(('chord', freqs, vol), lambda: chord_samples(freqs, 0.4, vol))
+
+    def sweep(self, freq_start, freq_end, duration, noise=False):
+        return self.get(('sweep', freq_start, freq_end, duration, noise), lambda: sweep_samples(freq_start, freq_end, duration, noise))
+
+    def prewarm(self, beeps=(), chords=(), sweeps=()):
+        # beeps: bell frequencies (default duration/volume), chords: frequency lists,
+        # sweeps: sweep() argument tuples. Later misses are counted.
+        for f in beeps: self.beep(f)
+        for freqs in chords: self.chord(freqs)
+        for args in sweeps: self.sweep(*args)
+        self.warm = True
+        if self.cache_path and self.dirty:
+            save_cache(self.cache_path, self.pcm)
+            self.dirty = False
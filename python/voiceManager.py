@@ -0,0 +1,59 @@
+import pygame
+
+# --- Voice Manager ---
+# All game sounds go through play() instead of Sound.play(), which silently drops a
+# sound whenever pygame's channel pool is full. The manager owns a fixed pool of
+# mixer channels and decides per request:
+#   coalesce  the same Sound already started within coalesce_ms -> skip it (recent()
+#             hands out that channel, e.g. for positionalAudio to merge into)
+#   per owner an owner (rider) holding per_owner voices steals its own oldest one
+#   full pool steal the oldest voice of the lowest priority, unless everything
+#             playing outranks the new sound (then it is dropped)
+# Priorities: chord > bell (= an arena impact) > ambient. Channel use (and mixing cost) stays bounded
+# however many riders there are.
+PRIORITY = {'ambient': 0, 'bell': 1, 'impact': 1, 'chord': 2}
+
+class VoiceManager:
+    def __init__(self, channels=16, per_owner=4, coalesce_ms=25):
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [None] * channels # (priority, start ms, owner) per channel
+        self.per_owner, self.coalesce_ms = per_owner, coalesce_ms
+        self.started = {} # Sound -> (ms it last started, channel index)
+        self.coalesced = self.stolen = self.dropped = 0
+
+    def play(self, sound, kind='bell', owner=None):
+        # Returns the Channel the sound plays on, or None if it was skipped
+        now = pygame.time.get_ticks()
+        if self.recent(sound, now):
+            self.coalesced += 1; return None
+        priority = PRIORITY[kind]
+        for i, ch in enumerate(self.channels):
+            if self.voices[i] and not ch.get_busy(): self.voices[i] = None
+        live = [i for i, v in enumerate(self.voices) if v]
+        mine = [i for i in live if owner is not None and self.voices[i][2] == owner]
+        if len(mine) >= self.per_owner: slot = self.victim(mine, priority)
+        elif len(live) < len(self.channels): slot = self.voices.index(None)
+        else: slot = self.victim(live, priority)
+        if slot is None:
+            self.dropped += 1; return None
+        if self.voices[slot]: self.stolen += 1
+        ch = self.channels[slot]
+        ch.play(sound)
+        self.voices[slot] = (priority, now, owner)
+        self.started[sound] = (now, slot)
+        return ch
+
+    def recent(self, sound, now=None):
+        # The channel still playing this Sound if it started within coalesce_ms
+        if sound not in self.started: return None
+        start, slot = self.started[sound]
+        if (pygame.time.get_ticks() if now is None else now) - start > self.coalesce_ms: return None
+        ch = self.channels[slot]
+        return ch if ch.get_sound() is sound else None
+
+    def victim(self, slots, priority):
+        # Oldest of the lowest-priority voices, if it doesn't outrank the new sound
+        slot = min(slots, key=lambda i: self.voices[i][:2])
+        return slot if self.voices[slot][0] <= priority else None
+
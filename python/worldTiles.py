@@ -0,0 +1,180 @@
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+from arenaMap import load_arena, save_arena, distance_field
+
+# --- Tiled World ---
+# A world split into CHUNK x CHUNK tiles on disk (one small .arena per tile, with
+# its 'grid' and 'dist' layers), plus index.json. Only tiles near an active player
+# stay in memory: request_around() queues the ones within draw distance for a
+# background loader thread, and an LRU drops the least recently wanted ones once
+# more than `capacity` are loaded, so memory stays flat however big the world is.
+# world[x][z] / world.field[x][z] read it like a list-of-lists grid (anything outside
+# the world is wall), but build a row object per read; hot paths use get(x, z) /
+# field_at(x, z), and rays use cast_ray() below, which reads straight from the tile
+# the ray is crossing.
+CHUNK = 64 # power of two
+WALL = 3
+LEAP_MIN = 3 # as mapView110.LEAP_MIN
+
+class _Row:
+    __slots__ = ('world', 'x', 'layer')
+    def __init__(self, world, x, layer):
+        self.world, self.x, self.layer = world, x, layer
+    def __getitem__(self, z):
+        return self.world.cell(self.x, z, self.layer)
+
+class _Layer:
+    # world.field[x][z] reads the distance field the same way
+    def __init__(self, world, layer):
+        self.world, self.layer = world, layer
+    def __getitem__(self, x):
+        return _Row(self.world, x, self.layer)
+    def __len__(self):
+        return self.world.width
+
+class TileWorld:
+    def __init__(self, directory, capacity=256):
+        with open(os.path.join(directory, "index.json"), "r") as f: index = json.load(f)
+        self.dir, self.width, self.height, self.chunk = directory, index['width'], index['height'], index['chunk']
+        self.shift, self.mask = self.chunk.bit_length() - 1, self.chunk - 1
+        self.capacity = capacity
+        self.chunks = OrderedDict() # (cx, cz) -> (grid bytes, dist bytes)
+        self.lock = threading.Lock()
+        self.pending, self.queue = set(), queue.Queue()
+        self.sync_loads = 0 # tiles that had to be loaded on the frame path
+        self.field = _Layer(self, 1)
+        threading.Thread(target=self.loader_thread, daemon=True).start()
+
+    def __getitem__(self, x):
+        return _Row(self, x, 0)
+
+    def __len__(self):
+        return self.width
+
+    def cell(self, x, z, layer=0):
+        if not (0 <= x < self.width and 0 <= z < self.height): return WALL if layer == 0 else 0
+        return self.tile(x >> self.shift, z >> self.shift)[layer][((x & self.mask) << self.shift) | (z & self.mask)]
+
+    def get(self, x, z):
+        if 0 <= x < self.width and 0 <= z < self.height:
+            return self.tile(x >> self.shift, z >> self.shift)[0][((x & self.mask) << self.shift) | (z & self.mask)]
+        return WALL
+
+    def field_at(self, x, z):
+        if 0 <= x < self.width and 0 <= z < self.height:
+            return self.tile(x >> self.shift, z >> self.shift)[1][((x & self.mask) << self.shift) | (z & self.mask)]
+        return 0
+
+    def tile(self, cx, cz):
+        # (grid bytes, dist bytes) of a tile; loaded on the spot if the loader
+        # thread hasn't brought it in yet
+        tile = self.chunks.get((cx, cz))
+        if tile is None:
+            self.sync_loads += 1
+            tile = self.store((cx, cz), self.read_tile((cx, cz)))
+        return tile
+
+    def read_tile(self, key):
+        arena = load_arena(os.path.join(self.dir, f"c_{key[0]}_{key[1]}.arena"))
+        return arena.layers['grid'], arena.layers['dist']
+
+    def store(self, key, tile):
+        with self.lock:
+            self.chunks[key] = tile
+            self.chunks.move_to_end(key)
+            self.pending.discard(key)
+            while len(self.chunks) > self.capacity: self.chunks.popitem(last=False)
+        return tile
+
+    def request_around(self, x, z, radius):
+        # Call once per frame per player: refreshes LRU order of nearby tiles and
+        # queues the missing ones for the loader thread.
+        x0, x1 = max(0, int(x - radius)) >> self.shift, min(self.width - 1, int(x + radius)) >> self.shift
+        z0, z1 = max(0, int(z - radius)) >> self.shift, min(self.height - 1, int(z + radius)) >> self.shift
+        with self.lock:
+            for cx in range(x0, x1 + 1):
+                for cz in range(z0, z1 + 1):
+                    key = (cx, cz)
+                    if key in self.chunks: self.chunks.move_to_end(key)
+                    elif key not in self.pending:
+                        self.pending.add(key); self.queue.put(key)
+
+    def loader_thread(self):
+        while True:
+            key = self.queue.get()
+            if key not in self.chunks: self.store(key, self.read_tile(key))
+            else:
+                with self.lock: self.pending.discard(key)
+
+# --- Tiled Raycaster ---
+# mapView110.cast_ray (same DDA, same distance-field leaps, same return value) over
+# a TileWorld. The tile under the ray is held in locals and only fetched again when
+# the ray crosses into the next one, so a cell read is one index into its bytes.
+def cast_ray(world, ox, oz, cos_a, sin_a, max_t, field=None):
+    width, height, shift, mask = world.width, world.height, world.shift, world.mask
+    leap = 1 / max(abs(cos_a), abs(sin_a))
+    t0, px, pz = 0.0, ox, oz
+    tx = tz = -1; cells = dists = None
+    while True:
+        cx, cz = int(px), int(pz)
+        if cos_a > 0: step_x, delta_x = 1, 1 / cos_a; side_x = t0 + (cx + 1 - px) * delta_x
+        elif cos_a < 0: step_x, delta_x = -1, -1 / cos_a; side_x = t0 + (px - cx) * delta_x
+        else: step_x, delta_x, side_x = 0, float('inf'), float('inf')
+        if sin_a > 0: step_z, delta_z = 1, 1 / sin_a; side_z = t0 + (cz + 1 - pz) * delta_z
+        elif sin_a < 0: step_z, delta_z = -1, -1 / sin_a; side_z = t0 + (pz - cz) * delta_z
+        else: step_z, delta_z, side_z = 0, float('inf'), float('inf')
+        t = t0
+        while True:
+            if field is not None and 0 <= cx < width and 0 <= cz < height:
+                if cx >> shift != tx or cz >> shift != tz:
+                    tx, tz = cx >> shift, cz >> shift; cells, dists = world.tile(tx, tz)
+                d = dists[((cx & mask) << shift) | (cz & mask)]
+                if d >= LEAP_MIN: break
+            if side_x < side_z:
+                t, side = side_x, 0
+                side_x += delta_x; cx += step_x
+            else:
+                t, side = side_z, 1
+                side_z += delta_z; cz += step_z
+            if t > max_t: return None
+            if 0 <= cx < width and 0 <= cz < height:
+                if cx >> shift != tx or cz >> shift != tz:
+                    tx, tz = cx >> shift, cz >> shift; cells, dists = world.tile(tx, tz)
+                val = cells[((cx & mask) << shift) | (cz & mask)]
+            else: val = WALL
+            if val >= WALL:
+                offset = (oz + t * sin_a) % 1 if side == 0 else (ox + t * cos_a) % 1
+                return t, val, side, offset
+        t0 = t + (d - 1.01) * leap
+        if t0 > max_t: return None
+        px, pz = ox + t0 * cos_a, oz + t0 * sin_a
+
+def split_world(src, out_dir, chunk=CHUNK):
+    # Cut an .arena (e.g. from mapGen24, or a compiled one from .arena_cache) into
+    # tiles. The distance field is taken from the whole map so it is correct across
+    # tile borders.
+    arena = load_arena(src)
+    grid = arena.rows('grid')
+    dist = arena.rows('dist') if 'dist' in arena.layers else distance_field(grid)
+    os.makedirs(out_dir, exist_ok=True)
+    for cx in range(0, arena.width, chunk):
+        for cz in range(0, arena.height, chunk):
+            tile = [bytes(row[cz:cz + chunk]).ljust(chunk, bytes([WALL])) for row in grid[cx:cx + chunk]]
+            tile_dist = [bytes(row[cz:cz + chunk]).ljust(chunk, b'\0') for row in dist[cx:cx + chunk]]
+            tile += [bytes([WALL]) * chunk] * (chunk - len(tile))
+            tile_dist += [b'\0' * chunk] * (chunk - len(tile_dist))
+            save_arena(os.path.join(out_dir, f"c_{cx // chunk}_{cz // chunk}.arena"), tile, dist=tile_dist)
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump({'width': arena.width, 'height': arena.height, 'chunk': chunk}, f)
+
+if __name__ == "__main__":
+    import sys
+    # python worldTiles.py split big.arena big_world
+    if len(sys.argv) >= 4 and sys.argv[1] == "split":
+        split_world(sys.argv[2], sys.argv[3], int(sys.argv[4]) if len(sys.argv) > 4 else CHUNK)
+        print(f"Split {sys.argv[2]} into {sys.argv[3]}/")
+    else:
+        print("usage: worldTiles.py split <map.arena> <out_dir> [chunk]")